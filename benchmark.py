@@ -0,0 +1,362 @@
+"""
+Benchmarks for the env, observation, renderer, visualizer and agent hot paths.
+
+    python benchmark.py                      # quick sweep, compared to benchmark_baseline.json
+    python benchmark.py --full               # grid sizes up to 256 and more env counts
+    python benchmark.py --only step reset    # a subset of cases
+    python benchmark.py --output out.json    # also write the results
+    python benchmark.py --save-baseline      # make these results the new baseline
+
+Every case is timed best-of-repeat over enough calls to fill min_time, once
+per pass over the whole sweep, and its best pass is reported as microseconds
+per call and calls (or env steps) per second.
+A fixed reference workload is timed along the way, and comparisons scale
+times by its best time in each run, so a machine that runs slow for a whole
+run (CPU steal, frequency scaling, other jobs) does not read as slow code.
+A case slower than the baseline by more than --tolerance, and by more than
+--noise-floor microseconds, is timed again, and if it is still that slow
+it is a regression and the script exits with status 1. Regenerate the
+baseline with --save-baseline whenever a change speeds a case up, or later
+slowdowns hide under the old number.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from combat_arena import CombatArenaEnv, BatchedCombatArenaEnv, MultiUnitAgent, GameVisualizer
+from combat_arena.constants import MAX_UNITS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+TOLERANCE = 1.3
+# Slowdowns smaller than this are timer and scheduler noise, whatever their ratio
+NOISE_FLOOR_US = 100
+MIN_TIME = 0.05
+REPEAT = 5
+# Slow spells on a busy machine last seconds, so every case is timed again
+# on each pass over the sweep rather than in back-to-back rounds
+PASSES = 5
+REFERENCE_TIME = 0.02
+# Calls slower than this (save_animation) are timed once per pass
+SINGLE_CALL_TIME = 0.5
+SEED = 0
+
+QUICK = {"grid_sizes": (15, 64), "unit_counts": (MAX_UNITS, 50), "env_counts": (1, 64)}
+FULL = {"grid_sizes": (15, 32, 64, 128, 256), "unit_counts": (MAX_UNITS, 50, 200), "env_counts": (1, 16, 256, 1024)}
+# Matplotlib cases get slow on big grids; they stop at this size
+MAX_PLOT_GRID = 64
+ANIMATION_FRAMES = 10
+
+
+def measure(fn, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    Best seconds per call of fn over repeat rounds, each at least min_time / repeat
+    long; a call slower than SINGLE_CALL_TIME is timed just once
+    """
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    if elapsed >= SINGLE_CALL_TIME:
+        return elapsed
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / repeat / elapsed * 1.2))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+REFERENCE_MATRIX = np.random.default_rng(SEED).random((64, 64))
+
+
+def reference():
+    """Fixed interpreter and numpy work that measures how fast the machine is right now"""
+    total = 0
+    for i in range(1000):
+        total += i * i
+    for _ in range(20):
+        REFERENCE_MATRIX @ REFERENCE_MATRIX
+    return total
+
+
+def fits(grid_size, num_units):
+    """Leave room for walls and capture points next to both teams' spawns"""
+    return 2 * num_units <= grid_size * grid_size // 2
+
+
+def make_env(grid_size, num_units, **kwargs):
+    if not fits(grid_size, num_units):
+        return None
+    return CombatArenaEnv(grid_size, seed=SEED, num_units=num_units, **kwargs)
+
+
+def random_actions(rng, shape):
+    return rng.integers(-1, 7, size=shape).astype(np.int8)
+
+
+# Each case takes (grid_size, num_units, num_envs) and returns (fn, env steps per
+# call), or None when the combination does not apply
+
+def case_reset(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    return env and (env.reset, 1)
+
+
+def case_step(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    if env is None:
+        return None
+    actions = iter(itertools.cycle(random_actions(np.random.default_rng(SEED), (997, 2, num_units)).tolist()))
+
+    def step():
+        if env.step(next(actions))[3]:
+            env.reset()
+    return step, 1
+
+
+def case_observation(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    return env and (env.get_observation_for_agent, 1)
+
+
+def case_render_graphic(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    if env is None or grid_size > MAX_PLOT_GRID:
+        return None
+    fig, ax = plt.subplots(figsize=(10, 12))
+    return (lambda: env.render_graphic(ax, fig)), 1
+
+
+def case_render_rgb(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    return env and (env.render_rgb, 1)
+
+
+def case_capture_frame(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    if env is None:
+        return None
+    vis = GameVisualizer(env)
+
+    def capture():
+        vis.capture_frame()
+        if len(vis.frames) >= 1024:
+            vis.frames.clear()
+    return capture, 1
+
+
+def case_save_animation(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    if env is None or grid_size > MAX_PLOT_GRID:
+        return None
+    vis = GameVisualizer(env)
+    agents = MultiUnitAgent("A", seed=SEED), MultiUnitAgent("B", seed=SEED + 1)
+    observations = env.reset()
+    vis.capture_frame()
+    for _ in range(ANIMATION_FRAMES - 1):
+        observations = env.step(tuple(agent.select_actions(obs) for agent, obs in zip(agents, observations)))[:2]
+        vis.capture_frame()
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.gif")
+
+    def save():
+        with contextlib.redirect_stdout(io.StringIO()):
+            vis.save_animation(path, fps=2)
+    return save, 1
+
+
+def case_select_actions(grid_size, num_units, num_envs):
+    env = make_env(grid_size, num_units)
+    if env is None:
+        return None
+    agent = MultiUnitAgent(seed=SEED)
+    observation = env.get_observation_for_agent(True)
+    return (lambda: agent.select_actions(observation)), 1
+
+
+def case_batched_step(grid_size, num_units, num_envs):
+    if not fits(grid_size, num_units):
+        return None
+    env = BatchedCombatArenaEnv(num_envs, grid_size, seed=SEED, num_units=num_units)
+    actions = itertools.cycle(random_actions(np.random.default_rng(SEED), (17, num_envs, 2, num_units)))
+    return (lambda: env.step(next(actions))), num_envs
+
+
+def case_select_actions_batch(grid_size, num_units, num_envs):
+    if not fits(grid_size, num_units):
+        return None
+    observations = BatchedCombatArenaEnv(num_envs, grid_size, seed=SEED, num_units=num_units).get_observations()
+    agent = MultiUnitAgent(seed=SEED)
+    return (lambda: agent.select_actions_batch(observations, team=0)), num_envs
+
+
+# name -> (case, whether it is swept over env counts)
+CASES = {
+    "reset": (case_reset, False),
+    "step": (case_step, False),
+    "get_observation_for_agent": (case_observation, False),
+    "render_graphic": (case_render_graphic, False),
+    "render_rgb": (case_render_rgb, False),
+    "capture_frame": (case_capture_frame, False),
+    "save_animation": (case_save_animation, False),
+    "select_actions": (case_select_actions, False),
+    "batched_step": (case_batched_step, True),
+    "select_actions_batch": (case_select_actions_batch, True),
+}
+
+
+def result_key(result):
+    return result["name"], result["grid_size"], result["num_units"], result["num_envs"]
+
+
+def sweep_keys(sweep, names=None):
+    """(name, grid_size, num_units, num_envs) of every case in the sweep"""
+    keys = []
+    for name, (case, batched) in CASES.items():
+        if names and name not in names:
+            continue
+        env_counts = sweep["env_counts"] if batched else (1,)
+        keys.extend((name, *key) for key in itertools.product(sweep["grid_sizes"], sweep["unit_counts"], env_counts))
+    return keys
+
+
+def run(keys, min_time=MIN_TIME, repeat=REPEAT, passes=PASSES):
+    """
+    Time every case once per pass over the whole sweep, keeping each case's
+    best pass; returns the results and the best time of the reference,
+    which is timed before every case
+    """
+    best = {}
+    reference_seconds = float("inf")
+    for number in range(passes):
+        for key in keys:
+            prepared = CASES[key[0]][0](*key[1:])
+            if prepared is None:
+                continue
+            fn, steps = prepared
+            reference_seconds = min(reference_seconds, measure(reference, REFERENCE_TIME, repeat))
+            best[key] = min(best.get(key, (float("inf"),))[0], measure(fn, min_time, repeat)), steps
+            plt.close("all")
+    results = []
+    for (name, grid_size, num_units, num_envs), (seconds, steps) in best.items():
+        results.append({
+            "name": name,
+            "grid_size": grid_size,
+            "num_units": num_units,
+            "num_envs": num_envs,
+            "us_per_call": seconds * 1e6,
+            "per_sec": steps / seconds,
+        })
+        print(f"{name:<26} grid={grid_size:<4} units={num_units:<3} envs={num_envs:<5} "
+              f"{seconds * 1e6:12.1f} us/call {steps / seconds:14.1f} /s")
+    return results, reference_seconds * 1e6
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(report, baseline, tolerance=TOLERANCE, noise_floor=NOISE_FLOOR_US):
+    """
+    Print each case's time relative to the baseline, scaled to the machine
+    speed of the baseline run; returns the regressions
+    """
+    previous = {result_key(result): result for result in baseline["results"]}
+    scale = baseline["reference_us"] / report["reference_us"]
+    results = report["results"]
+    print(f"Reference workload {baseline['reference_us']:.1f} -> {report['reference_us']:.1f} us, times scaled by x{scale:.2f}")
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        us_per_call = result["us_per_call"] * scale
+        ratio = us_per_call / old["us_per_call"]
+        flag = ""
+        if ratio > tolerance and us_per_call - old["us_per_call"] > noise_floor:
+            flag = "  REGRESSION"
+            regressions.append(dict(result, baseline_us_per_call=old["us_per_call"], ratio=ratio))
+        elif ratio < 1 / tolerance:
+            flag = "  faster"
+        name, grid_size, num_units, num_envs = result_key(result)
+        print(f"{name:<26} grid={grid_size:<4} units={num_units:<3} envs={num_envs:<5} "
+              f"{old['us_per_call']:12.1f} -> {us_per_call:12.1f} us  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--full", action="store_true", help="sweep every grid size and env count")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="cases to run")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds spent timing each case per pass")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--passes", type=int, default=PASSES, help="sweeps to take each case's best time from")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="slowdown ratio counted as a regression")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_US,
+                        help="microseconds a case must slow down by to count as a regression")
+    args = parser.parse_args()
+
+    keys = sweep_keys(FULL if args.full else QUICK, args.only)
+    results, reference_us = run(keys, args.min_time, args.repeat, args.passes)
+    report = {"environment": environment(), "reference_us": reference_us, "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"\nCompared to {args.baseline}:")
+    regressions = compare(report, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        # One slow spell can catch a case on every pass; a real slowdown survives more
+        print(f"\nTiming {len(regressions)} slower case(s) again:")
+        retimed, retimed_reference_us = run([result_key(result) for result in regressions], args.min_time,
+                                            args.repeat, args.passes)
+        previous = {result_key(result): result for result in results}
+        retimed = [min(result, previous[result_key(result)], key=lambda r: r["us_per_call"]) for result in retimed]
+        print()
+        retimed_report = {"reference_us": min(reference_us, retimed_reference_us), "results": retimed}
+        regressions = compare(retimed_report, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than x{args.tolerance}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
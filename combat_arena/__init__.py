@@ -0,0 +1,48 @@
+"""
+Combat arena: a grid-based multi-unit battle environment.
+
+    from combat_arena import CombatArenaEnv, MultiUnitAgent, GameVisualizer
+
+The classes below are imported from their modules on first access, so
+importing the package (or the env alone) does not pull in the renderer
+backends, gymnasium or matplotlib. Constants live in combat_arena.constants.
+"""
+import importlib
+
+from .constants import *  # noqa: F401,F403
+
+# name -> submodule defining it
+_EXPORTS = {
+    "CombatArenaEnv": "env",
+    "state_dtype": "env",
+    "RULES": "env",
+    "MultiUnitAgent": "agent",
+    "PathfindingAgent": "pathfinding",
+    "GameVisualizer": "visualizer",
+    "BatchedCombatArenaEnv": "batched_env",
+    "SubprocCombatArenaEnv": "subproc_env",
+    "CombatArenaGymEnv": "gym_env",
+    "CombatArenaParallelEnv": "gym_env",
+    "MapPool": "mapgen",
+    "ScenarioBank": "scenarios",
+    "RasterRenderer": "renderer",
+    "ReplayReader": "replay",
+    "ReplayWriter": "replay",
+    "StepProfiler": "profiling",
+    "EvaluationStats": "evaluation",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
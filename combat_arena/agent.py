@@ -0,0 +1,90 @@
+import numpy as np
+
+from .constants import MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, ATTACK, DEFEND, RANDOM_MOVES
+
+class MultiUnitAgent:
+    def __init__(self, name="MultiUnitAgent", seed=None):
+        self.name = name
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reset the agent's own random generator"""
+        self.rng = np.random.default_rng(seed)
+
+    def select_actions(self, observation):
+        """
+        Returns a dictionary mapping unit IDs to actions
+        """
+        actions = {}
+        
+        for unit in observation["units"]:
+            if unit["health"] > 0:  # Only act with living units
+                unit_id = unit["id"]
+                visible_grid = observation["grid"]
+                
+                # Simple example logic: move randomly if no enemies visible
+                if not observation["visible_opponents"]:
+                    actions[unit_id] = RANDOM_MOVES[self.rng.integers(len(RANDOM_MOVES))]
+                else:
+                    # Attack nearest visible opponent
+                    nearest_opponent = min(
+                        observation["visible_opponents"],
+                        key=lambda x: abs(x["position"][0] - unit["position"][0]) + 
+                                    abs(x["position"][1] - unit["position"][1])
+                    )
+                    if abs(nearest_opponent["position"][0] - unit["position"][0]) + \
+                       abs(nearest_opponent["position"][1] - unit["position"][1]) == 1:
+                        actions[unit_id] = ATTACK
+                    else:
+                        # Move toward nearest opponent
+                        dx = nearest_opponent["position"][0] - unit["position"][0]
+                        dy = nearest_opponent["position"][1] - unit["position"][1]
+                        if abs(dx) > abs(dy):
+                            actions[unit_id] = MOVE_DOWN if dx > 0 else MOVE_UP
+                        else:
+                            actions[unit_id] = MOVE_RIGHT if dy > 0 else MOVE_LEFT
+                            
+        return actions
+
+    def select_actions_batch(self, observations, team=None):
+        """
+        Same policy as select_actions for many envs at once.
+
+        observations holds "unit_positions" (N, units, 2), "unit_health"
+        (N, units), "opponent_positions" (N, units, 2) and "opponent_visible"
+        (N, units) arrays, as in the array entries of env observations. With
+        team given, arrays carry a player axis after the env axis, as in
+        BatchedCombatArenaEnv observations, and that team's slice is used.
+
+        Returns an (N, units) int8 array of action codes, DEFEND for dead
+        units. Random moves are drawn env by env, unit by unit, so results
+        equal calling select_actions on each env in turn with the same RNG.
+        """
+        def take(key):
+            array = np.asarray(observations[key])
+            return array if team is None else array[:, team]
+
+        positions = take("unit_positions")
+        alive = take("unit_health") > 0
+        opponent_positions = take("opponent_positions")
+        visible = take("opponent_visible")
+
+        # Pairwise Manhattan distances (N, units, opponents); hidden opponents never win
+        offsets = opponent_positions[:, None, :, :] - positions[:, :, None, :]
+        distances = np.abs(offsets).sum(axis=-1)
+        distances = np.where(visible[:, None, :], distances, np.iinfo(distances.dtype).max)
+        nearest = distances.argmin(axis=2)  # first minimum, as min() picks
+        dx, dy = np.moveaxis(np.take_along_axis(offsets, nearest[..., None, None], axis=2)[:, :, 0], -1, 0)
+
+        chase = np.where(
+            np.abs(dx) > np.abs(dy),
+            np.where(dx > 0, MOVE_DOWN, MOVE_UP),
+            np.where(dy > 0, MOVE_RIGHT, MOVE_LEFT)
+        )
+        nearest_distance = np.take_along_axis(distances, nearest[..., None], axis=2)[..., 0]
+        actions = np.where(nearest_distance == 1, ATTACK, chase).astype(np.int8)
+
+        wander = alive & ~visible.any(axis=1)[:, None]
+        actions[wander] = np.array(RANDOM_MOVES)[self.rng.integers(len(RANDOM_MOVES), size=int(wander.sum()))]
+        actions[~alive] = DEFEND
+        return actions
@@ -0,0 +1,307 @@
+import numpy as np
+
+from .constants import (
+    MAX_UNITS, VISION_RANGE, WALL, CAPTURE_NEUTRAL, CAPTURE_P1, CAPTURE_P2,
+    PLAYER1, PLAYER2, ATTACK, DEFEND, MOVE_OFFSETS,
+    GRID_SIZE, MAX_TURNS, INITIAL_HEALTH, WALL_DENSITY, CAPTURE_DENSITY,
+    HIT_CHANCE, ATTACK_DAMAGE, HIT_REWARD, MISS_REWARD, BLOCKED_MOVE_REWARD, CAPTURE_REWARD,
+    ROLL_BLOCK_TURNS, MAX_ADJACENT, NO_UNIT, NEIGHBOUR_OFFSETS
+)
+from .units import unit_ids
+from .visibility import dilate
+from .mapgen import draw_map, check_map_pool
+
+# Lookup tables indexed by action + 1 (actions range from MOVE_NO=-1 to DEFEND=6)
+_ACTION_OFFSET = 1
+_NUM_ACTION_CODES = 8
+_IS_MOVE = np.zeros(_NUM_ACTION_CODES, dtype=bool)
+_MOVE_CODES = [a + _ACTION_OFFSET for a in MOVE_OFFSETS]
+_IS_MOVE[_MOVE_CODES] = True
+_DX = np.zeros(_NUM_ACTION_CODES, dtype=np.int16)
+_DY = np.zeros(_NUM_ACTION_CODES, dtype=np.int16)
+_DX[_MOVE_CODES] = [dx for dx, _ in MOVE_OFFSETS.values()]
+_DY[_MOVE_CODES] = [dy for _, dy in MOVE_OFFSETS.values()]
+
+_BLOCKED = np.zeros(256, dtype=bool)
+_BLOCKED[[WALL, PLAYER1, PLAYER2]] = True
+
+_NEIGHBOUR_DX = np.array([dx for dx, _ in NEIGHBOUR_OFFSETS], dtype=np.int16)
+_NEIGHBOUR_DY = np.array([dy for _, dy in NEIGHBOUR_OFFSETS], dtype=np.int16)
+
+_PLAYER_CODES = (PLAYER1, PLAYER2)
+_CAPTURE_CODES = (CAPTURE_P1, CAPTURE_P2)
+
+
+class BatchedCombatArenaEnv:
+    """
+    Runs num_envs independent arenas as one set of NumPy arrays.
+
+    Grids live in an (N, H, W) int8 array and unit state in (N, 2, num_units)
+    arrays, where axis 1 is the player (0 = player 1, 1 = player 2). Rules
+    match CombatArenaEnv: units act in slot order, player 1 first, and every
+    rule is applied to all envs at once. Finished envs are reset automatically.
+
+    Each env has its own Generator; with a seed, env i draws exactly what
+    CombatArenaEnv(seed=seed + i) would, so every episode replays bit for bit.
+
+    Without a map_pool every reset generates a new map and checks that its
+    spawns connect, which dominates step time for large batches (about half
+    of it at 1024 envs). For training, pass a mapgen.MapPool or a
+    scenarios.ScenarioBank: resets then only copy a stored map.
+    """
+
+    def __init__(self, num_envs, grid_size=GRID_SIZE, max_turns=MAX_TURNS, seed=None,
+                 wall_density=WALL_DENSITY, capture_density=CAPTURE_DENSITY, map_pool=None, num_units=MAX_UNITS):
+        check_map_pool(map_pool, grid_size, num_units)
+        self.num_envs = num_envs
+        self.num_units = num_units
+        self.grid_size = grid_size
+        self.max_turns = max_turns
+        self.wall_density = wall_density
+        self.capture_density = capture_density
+        self.map_pool = map_pool
+
+        shape = (num_envs, 2, num_units)
+        self.grid = np.zeros((num_envs, grid_size, grid_size), dtype=np.int8)
+        self.terrain = np.zeros((num_envs, grid_size, grid_size), dtype=np.int8)
+        # Spatial index: player * num_units + slot of the living unit on each cell, or NO_UNIT
+        index_dtype = np.int16 if 2 * num_units <= np.iinfo(np.int16).max else np.int32
+        self.occupant = np.full((num_envs, grid_size, grid_size), NO_UNIT, dtype=index_dtype)
+        self.pos_x = np.zeros(shape, dtype=np.int16)
+        self.pos_y = np.zeros(shape, dtype=np.int16)
+        self.health = np.zeros(shape, dtype=np.int16)
+        self.capture_points = np.zeros((num_envs, 2), dtype=np.int32)
+        self.turn = np.zeros(num_envs, dtype=np.int32)
+        self._env_index = np.arange(num_envs)
+        self._vacated = []
+        self.rngs = [np.random.default_rng(None if seed is None else seed + i) for i in range(num_envs)]
+        self._hit_rolls = np.zeros((num_envs, ROLL_BLOCK_TURNS, 2, num_units, MAX_ADJACENT))
+        # Scratch buffers for the fog-of-war pass, reused every step
+        self._occupancy = np.zeros((num_envs, 2, grid_size, grid_size), dtype=bool)
+        self._vision = np.zeros_like(self._occupancy)
+        self._vision_scratch = np.zeros_like(self._occupancy)
+        self.reset()
+
+    def reset(self, seed=None, scenario_ids=None):
+        """scenario_ids, if given, holds the map_pool map each env resets to instead of drawing one"""
+        if seed is not None:
+            self.rngs = [np.random.default_rng(seed + i) for i in range(self.num_envs)]
+        if scenario_ids is None:
+            self._reset_envs(self._env_index)
+        else:
+            if self.map_pool is None:
+                raise ValueError("reset(scenario_ids=...) needs a map_pool, e.g. a scenarios.ScenarioBank")
+            if len(scenario_ids) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} scenario ids, got {len(scenario_ids)}")
+            for i, scenario_id in enumerate(scenario_ids):
+                self._reset_env(i, scenario_id)
+        return self.get_observations()
+
+    def _reset_envs(self, env_ids):
+        for i in env_ids:
+            self._reset_env(int(i))
+
+    def _reset_env(self, i, scenario_id=None):
+        # Same draws as CombatArenaEnv.reset so a seeded env gives the same map
+        rng = self.rngs[i]
+        if scenario_id is not None:
+            terrain, spawns = self.map_pool[scenario_id]
+        elif self.map_pool is not None:
+            terrain, spawns = self.map_pool.draw(rng)
+        else:
+            terrain, spawns = draw_map(rng, self.grid_size, self.num_units, self.wall_density, self.capture_density)
+        self.terrain[i] = terrain
+        self.grid[i] = terrain
+        self.occupant[i] = NO_UNIT
+        for p in range(2):
+            self.grid[i, spawns[p, :, 0], spawns[p, :, 1]] = _PLAYER_CODES[p]
+            self.occupant[i, spawns[p, :, 0], spawns[p, :, 1]] = p * self.num_units + np.arange(self.num_units)
+        self.pos_x[i] = spawns[..., 0]
+        self.pos_y[i] = spawns[..., 1]
+
+        self.health[i] = INITIAL_HEALTH
+        self.capture_points[i] = 0
+        self.turn[i] = 0
+
+    def step(self, actions):
+        """
+        Expects an (N, 2, num_units) int array of action codes, indexed by env,
+        player and unit slot. Returns observations, (N, 2) rewards, an (N,) done
+        mask and an info dict; envs flagged done have already been reset.
+        """
+        actions = np.asarray(actions)
+        codes = actions.astype(np.int64) + _ACTION_OFFSET
+        codes = np.where((codes >= 0) & (codes < _NUM_ACTION_CODES), codes, DEFEND + _ACTION_OFFSET)
+        rewards = np.zeros((self.num_envs, 2), dtype=np.int32)
+
+        block_turn = self.turn % ROLL_BLOCK_TURNS
+        for i in np.flatnonzero(block_turn == 0):
+            self._hit_rolls[i] = self.rngs[i].random((ROLL_BLOCK_TURNS, 2, self.num_units, MAX_ADJACENT))
+        rolls = self._hit_rolls[self._env_index, block_turn]
+
+        for p in range(2):
+            for u in range(self.num_units):
+                self._apply_unit_action(p, u, codes[:, p, u], rolls[:, p, u], rewards)
+
+        self._update_grid_positions()
+        self.turn += 1
+
+        p1_alive = (self.health[:, 0] > 0).any(axis=1)
+        p2_alive = (self.health[:, 1] > 0).any(axis=1)
+        dones = (self.turn >= self.max_turns) | ~p1_alive | ~p2_alive
+
+        info = {}
+        if dones.any():
+            info["final_observation"] = self.get_observations()
+            self._reset_envs(np.flatnonzero(dones))
+
+        return self.get_observations(), rewards, dones, info
+
+    def _apply_unit_action(self, p, u, code, rolls, rewards):
+        envs = self._env_index
+        x = self.pos_x[:, p, u]
+        y = self.pos_y[:, p, u]
+        active = self.health[:, p, u] > 0
+
+        # Movement
+        moving = active & _IS_MOVE[code]
+        new_x = x + _DX[code]
+        new_y = y + _DY[code]
+        in_bounds = (new_x >= 0) & (new_x < self.grid_size) & (new_y >= 0) & (new_y < self.grid_size)
+        safe_x = np.clip(new_x, 0, self.grid_size - 1)
+        safe_y = np.clip(new_y, 0, self.grid_size - 1)
+        moved = moving & in_bounds & ~_BLOCKED[self.grid[envs, safe_x, safe_y]]
+        rewards[:, p] += BLOCKED_MOVE_REWARD * (moving & ~moved)
+
+        # The old cell stays blocked until the end of the turn
+        moved_envs, old_x, old_y = envs[moved], x[moved], y[moved]
+        moved_x, moved_y = new_x[moved], new_y[moved]
+        self._vacated.append((moved_envs, old_x, old_y))
+        captured = moved & (self.terrain[envs, safe_x, safe_y] == CAPTURE_NEUTRAL)
+        self.terrain[envs[captured], new_x[captured], new_y[captured]] = _CAPTURE_CODES[p]
+        self.grid[moved_envs, moved_x, moved_y] = _PLAYER_CODES[p]
+        self.occupant[moved_envs, old_x, old_y] = NO_UNIT
+        self.occupant[moved_envs, moved_x, moved_y] = p * self.num_units + u
+        rewards[:, p] += CAPTURE_REWARD * captured
+        self.capture_points[:, p] += captured
+        self.pos_x[moved, p, u] = moved_x
+        self.pos_y[moved, p, u] = moved_y
+
+        # Attack: try adjacent opponents in slot order until one hit lands
+        attacking = np.flatnonzero(active & (code == ATTACK + _ACTION_OFFSET))
+        if attacking.size == 0:
+            return
+        q = 1 - p
+        # Opponent slots on the four neighbouring cells, from the spatial index
+        neighbour_x = x[attacking, None] + _NEIGHBOUR_DX
+        neighbour_y = y[attacking, None] + _NEIGHBOUR_DY
+        inside = (neighbour_x >= 0) & (neighbour_x < self.grid_size) & (neighbour_y >= 0) & (neighbour_y < self.grid_size)
+        occupant = self.occupant[
+            attacking[:, None], np.clip(neighbour_x, 0, self.grid_size - 1), np.clip(neighbour_y, 0, self.grid_size - 1)
+        ].astype(np.int64) - q * self.num_units
+        adjacent = inside & (occupant >= 0) & (occupant < self.num_units)
+        targets = np.sort(np.where(adjacent, occupant, self.num_units), axis=1)
+
+        # Each adjacent target uses the attacker's next pre-drawn roll; the first landed one is hit
+        landed = (targets < self.num_units) & (rolls[attacking] < HIT_CHANCE)
+        hit = landed.any(axis=1)
+        envs, target = attacking[hit], targets[hit, landed[hit].argmax(axis=1)]
+        self.health[envs, q, target] -= ATTACK_DAMAGE
+        killed = self.health[envs, q, target] <= 0
+        envs, target = envs[killed], target[killed]
+        killed_x, killed_y = self.pos_x[envs, q, target], self.pos_y[envs, q, target]
+        self._vacated.append((envs, killed_x, killed_y))
+        self.occupant[envs, killed_x, killed_y] = NO_UNIT
+        rewards[attacking, p] += np.where(hit, HIT_REWARD, MISS_REWARD)
+
+    def _update_grid_positions(self):
+        """Restore the terrain under cells vacated this turn by units that moved or died"""
+        for env_ids, xs, ys in self._vacated:
+            self.grid[env_ids, xs, ys] = self.terrain[env_ids, xs, ys]
+        self._vacated.clear()
+
+    def get_observations(self):
+        """
+        Fog-of-war observations for every env, stacked per player on axis 1.
+        The player at index p sees its own units under "unit_*" and the
+        opponents its units can see under "opponent_*".
+        """
+        alive = self.health > 0
+
+        occupancy = self._occupancy
+        occupancy.fill(False)
+        env_ids = np.broadcast_to(self._env_index[:, None, None], alive.shape)
+        player_ids = np.broadcast_to(np.arange(2)[None, :, None], alive.shape)
+        occupancy[env_ids[alive], player_ids[alive], self.pos_x[alive], self.pos_y[alive]] = True
+        vision = dilate(occupancy, VISION_RANGE, out=self._vision, scratch=self._vision_scratch)
+
+        grid = np.where(vision, self.grid[:, None], np.int8(-1))
+
+        positions = np.stack([self.pos_x, self.pos_y], axis=-1)
+        opponent_positions = positions[:, ::-1]
+        opponent_health = self.health[:, ::-1]
+        opponent_visible = alive[:, ::-1] & vision[
+            env_ids, player_ids, opponent_positions[..., 0], opponent_positions[..., 1]
+        ]
+
+        return {
+            "grid": grid,
+            "unit_positions": positions,
+            "unit_health": self.health.copy(),
+            "opponent_positions": np.where(opponent_visible[..., None], opponent_positions, -1),
+            "opponent_health": np.where(opponent_visible, opponent_health, 0),
+            "opponent_visible": opponent_visible,
+            "capture_points": self.capture_points.copy(),
+            "turn": self.turn.copy(),
+        }
+
+    def observation_for(self, observations, env_id, is_agent_one=True):
+        """
+        Convert one env's slice of batched observations to the CombatArenaEnv
+        dict format, array entries included (as views into observations)
+        """
+        p = 0 if is_agent_one else 1
+        ids, opponent_ids = unit_ids(p, self.num_units), unit_ids(1 - p, self.num_units)
+        positions = observations["unit_positions"][env_id, p]
+        health = observations["unit_health"][env_id, p]
+        opponent_positions = observations["opponent_positions"][env_id, p]
+        opponent_health = observations["opponent_health"][env_id, p]
+        visible = observations["opponent_visible"][env_id, p]
+        return {
+            "grid": observations["grid"][env_id, p],
+            "units": [
+                {
+                    "position": (int(positions[u, 0]), int(positions[u, 1])),
+                    "health": int(health[u]),
+                    "id": ids[u]
+                } for u in range(self.num_units)
+            ],
+            "visible_opponents": [
+                {
+                    "position": (int(opponent_positions[u, 0]), int(opponent_positions[u, 1])),
+                    "health": int(opponent_health[u]),
+                    "id": opponent_ids[u]
+                } for u in range(self.num_units) if visible[u]
+            ],
+            "capture_points": int(observations["capture_points"][env_id, p]),
+            "turn": int(observations["turn"][env_id]),
+            # Array form of the same data, indexed by unit slot
+            "unit_positions": positions,
+            "unit_health": health,
+            "opponent_positions": opponent_positions,
+            "opponent_health": opponent_health,
+            "opponent_visible": visible
+        }
+
+    def actions_from_dicts(self, action_dicts):
+        """
+        Build the (N, 2, num_units) action array from per-env (actions_p1, actions_p2)
+        dictionaries keyed by unit id, as passed to CombatArenaEnv.step.
+        Units without an entry get DEFEND, which like a missing entry does nothing.
+        """
+        actions = np.full((self.num_envs, 2, self.num_units), DEFEND, dtype=np.int8)
+        for i, pair in enumerate(action_dicts):
+            for p, unit_actions in enumerate(pair):
+                for unit_id, action in unit_actions.items():
+                    actions[i, p, int(unit_id.rsplit("U", 1)[1])] = action
+        return actions
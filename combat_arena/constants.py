@@ -0,0 +1,59 @@
+"""
+Shared game constants: cell codes, action codes, rewards and default sizes.
+
+Every module in the package imports these from here, so a code has one
+definition and the grid, observations, replays and renderers agree on it.
+"""
+
+# Cell codes, as stored in the grid and terrain arrays
+FOG = -1  # only in observations: the cell is outside every unit's vision
+EMPTY = 0
+WALL = 1
+CAPTURE_NEUTRAL = 2
+CAPTURE_P1 = 3
+CAPTURE_P2 = 4
+PLAYER1 = 5
+PLAYER2 = 6
+
+# Action codes, one per unit per step
+MOVE_NO = -1
+MOVE_UP = 0
+MOVE_DOWN = 1
+MOVE_LEFT = 2
+MOVE_RIGHT = 3
+ATTACK = 4
+DEFEND = 6
+MOVES = (MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT)
+# Moves the scripted agents pick from when they have nothing better to do
+RANDOM_MOVES = MOVES
+# (dx, dy) of every move code; x is the row, so MOVE_UP decreases it
+MOVE_OFFSETS = {MOVE_NO: (0, 0), MOVE_UP: (-1, 0), MOVE_DOWN: (1, 0), MOVE_LEFT: (0, -1), MOVE_RIGHT: (0, 1)}
+
+# Unit ids are "<prefix>_U<slot>", e.g. "P1_U0"
+PLAYER_PREFIXES = ("P1", "P2")
+
+# Defaults
+GRID_SIZE = 15
+MAX_TURNS = 30
+MAX_UNITS = 5
+INITIAL_HEALTH = 100
+VISION_RANGE = 2
+WALL_DENSITY = 0.1  # 10% cells are walls
+CAPTURE_DENSITY = 0.05  # 5% cells are capture points
+
+# Combat
+HIT_CHANCE = 0.7
+ATTACK_DAMAGE = 10
+# Rewards, the same under both rule sets and in the batched env
+HIT_REWARD = 10
+MISS_REWARD = -2  # an attack that hits nobody
+BLOCKED_MOVE_REWARD = -1  # a move off the map, into a wall or into a unit
+CAPTURE_REWARD = 5
+# Attack rolls are drawn this many turns at a time, one roll for each of up to
+# four adjacent targets per unit, so the RNG stream depends only on the seed
+ROLL_BLOCK_TURNS = 16
+MAX_ADJACENT = 4
+# Spatial index entry for a cell no unit stands on
+NO_UNIT = -1
+# Same order as MOVES: up, down, left, right
+NEIGHBOUR_OFFSETS = tuple(MOVE_OFFSETS[move] for move in MOVES)
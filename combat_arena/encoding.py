@@ -0,0 +1,76 @@
+import numpy as np
+
+from .constants import (
+    FOG, MAX_UNITS, WALL, CAPTURE_NEUTRAL, CAPTURE_P1, CAPTURE_P2, PLAYER1, PLAYER2,
+    MOVE_NO, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, ATTACK, DEFEND
+)
+
+# Index i of an encoded action vector entry maps to ACTION_TABLE[i]
+ACTION_TABLE = np.array([MOVE_NO, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT, ATTACK, DEFEND])
+NUM_ACTIONS = len(ACTION_TABLE)
+
+GRID_CHANNELS = ("visible", "wall", "capture_neutral", "capture_own", "capture_opponent", "unit_own", "unit_opponent")
+UNIT_FEATURES = ("x", "y", "health", "alive")
+OPPONENT_FEATURES = ("x", "y", "health", "visible")
+STAT_FEATURES = ("capture_points", "turn")
+
+# Cell codes for every channel after "visible", seen from each team's side
+_CHANNEL_CODES = (
+    np.array([WALL, CAPTURE_NEUTRAL, CAPTURE_P1, CAPTURE_P2, PLAYER1, PLAYER2]),
+    np.array([WALL, CAPTURE_NEUTRAL, CAPTURE_P2, CAPTURE_P1, PLAYER2, PLAYER1]),
+)
+
+
+def observation_shapes(grid_size, num_units=MAX_UNITS):
+    """Shape and dtype of every array in an encoded observation"""
+    return {
+        "grid": ((len(GRID_CHANNELS), grid_size, grid_size), np.uint8),
+        "units": ((num_units, len(UNIT_FEATURES)), np.int16),
+        "opponents": ((num_units, len(OPPONENT_FEATURES)), np.int16),
+        "alive_mask": ((num_units,), np.int8),
+        "stats": ((len(STAT_FEATURES),), np.int32),
+    }
+
+
+def allocate_observation(grid_size, num_units=MAX_UNITS, leading_shape=()):
+    """Zeroed arrays for encoded observations, with optional leading batch dimensions"""
+    return {
+        key: np.zeros(tuple(leading_shape) + shape, dtype=dtype)
+        for key, (shape, dtype) in observation_shapes(grid_size, num_units).items()
+    }
+
+
+def encode_observation(observation, team, out):
+    """
+    Fill out (from allocate_observation) with the fixed-shape encoding of an
+    observation returned by CombatArenaEnv.get_observation_for_agent.
+
+    team is 0 for player 1 and 1 for player 2; channels and features are
+    always relative to that team ("own" versus "opponent").
+    """
+    grid = observation["grid"]
+    planes = out["grid"]
+    np.not_equal(grid, FOG, out=planes[0], casting="unsafe")
+    np.equal(grid[None], _CHANNEL_CODES[team][:, None, None], out=planes[1:], casting="unsafe")
+
+    alive = observation["unit_health"] > 0
+    units = out["units"]
+    units[:, 0:2] = observation["unit_positions"]
+    units[:, 2] = observation["unit_health"]
+    units[:, 3] = alive
+    out["alive_mask"][:] = alive
+
+    visible = observation["opponent_visible"]
+    opponents = out["opponents"]
+    opponents[:, 0:2] = np.where(visible[:, None], observation["opponent_positions"], 0)
+    opponents[:, 2] = np.where(visible, observation["opponent_health"], 0)
+    opponents[:, 3] = visible
+
+    out["stats"][0] = observation["capture_points"]
+    out["stats"][1] = observation["turn"]
+    return out
+
+
+def decode_actions(actions):
+    """Map an int vector of ACTION_TABLE indices to env action codes, one per unit slot"""
+    return ACTION_TABLE[np.asarray(actions)]
@@ -0,0 +1,536 @@
+import numpy as np
+
+from .constants import (
+    MAX_UNITS, VISION_RANGE, WALL, CAPTURE_NEUTRAL, CAPTURE_P1, CAPTURE_P2, PLAYER1, PLAYER2,
+    MOVE_NO, MOVE_RIGHT, ATTACK, DEFEND, MOVE_OFFSETS,
+    GRID_SIZE, MAX_TURNS, INITIAL_HEALTH, WALL_DENSITY, CAPTURE_DENSITY,
+    HIT_CHANCE, ATTACK_DAMAGE, HIT_REWARD, MISS_REWARD, BLOCKED_MOVE_REWARD, CAPTURE_REWARD,
+    ROLL_BLOCK_TURNS, MAX_ADJACENT, NO_UNIT, NEIGHBOUR_OFFSETS
+)
+from .units import UnitStore, PlayerView, UnitList
+from .visibility import VisibilityEngine
+from .mapgen import draw_map, check_map_pool
+from .renderer import RasterRenderer, CELL_SIZE
+
+# "sequential": units act one at a time, player 1's first, as originally.
+# "simultaneous": every unit acts on the state at the start of the turn.
+RULES = ("sequential", "simultaneous")
+
+# Move offsets indexed by action + 1, for MOVE_NO through MOVE_RIGHT
+_MOVE_DX = np.array([MOVE_OFFSETS[action][0] for action in range(MOVE_NO, MOVE_RIGHT + 1)])
+_MOVE_DY = np.array([MOVE_OFFSETS[action][1] for action in range(MOVE_NO, MOVE_RIGHT + 1)])
+_NEIGHBOUR_DX = np.array([dx for dx, _ in NEIGHBOUR_OFFSETS])
+_NEIGHBOUR_DY = np.array([dy for _, dy in NEIGHBOUR_OFFSETS])
+
+
+def state_dtype(grid_size, num_units=MAX_UNITS):
+    """
+    Structured dtype of one packed CombatArenaEnv state (see get_state).
+    Hit rolls only ever matter as roll < HIT_CHANCE, so they are kept as
+    hit flags; the PCG64 state and increment are 128-bit little-endian.
+    """
+    return np.dtype([
+        ("terrain", np.int8, (grid_size, grid_size)),
+        ("grid", np.int8, (grid_size, grid_size)),
+        ("positions", np.int16, (2, num_units, 2)),
+        ("health", np.int16, (2, num_units)),
+        ("capture_points", np.int32, (2,)),
+        ("turn", np.int32),
+        ("has_rolls", np.bool_),
+        ("hits", np.bool_, (ROLL_BLOCK_TURNS, 2, num_units, MAX_ADJACENT)),
+        ("rng_state", np.uint8, (16,)),
+        ("rng_inc", np.uint8, (16,)),
+        ("rng_has_uint32", np.uint8),
+        ("rng_uinteger", np.uint32),
+    ])
+
+class CombatArenaEnv:
+    # Same frame rate as GameVisualizer.save_animation
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 2}
+
+    def __init__(self, grid_size=GRID_SIZE, max_turns=MAX_TURNS, reuse_buffers=False, ego_patches=False, seed=None,
+                 wall_density=WALL_DENSITY, capture_density=CAPTURE_DENSITY, map_pool=None, render_mode=None,
+                 profiler=None, num_units=MAX_UNITS, rules="sequential"):
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Unknown render_mode {render_mode!r}")
+        if rules not in RULES:
+            raise ValueError(f"Unknown rules {rules!r}, expected one of {RULES}")
+        self.rules = rules
+        # None renders nothing, "rgb_array" returns frames from render(),
+        # "human" also draws every reset into a matplotlib figure
+        self.render_mode = render_mode
+        self._renderer = None
+        self._figure = None
+        self.grid_size = grid_size
+        self.max_turns = max_turns
+        self.turn = 0
+        self.wall_density = wall_density
+        self.capture_density = capture_density
+        # An optional mapgen.MapPool or scenarios.ScenarioBank; resets then copy
+        # one of its maps instead of generating
+        check_map_pool(map_pool, grid_size, num_units)
+        self.map_pool = map_pool
+        # With reuse_buffers the observation grids are overwritten in place every step
+        self.reuse_buffers = reuse_buffers
+        self.ego_patches = ego_patches
+        # An optional profiling.StepProfiler timing each phase of step()
+        self.profiler = profiler
+        self.visibility = VisibilityEngine(grid_size, VISION_RANGE, WALL)
+        self._obs_buffers = [np.empty((grid_size, grid_size), dtype=np.int64) for _ in range(2)]
+        self.num_units = num_units
+        self.units = UnitStore(num_units, INITIAL_HEALTH)
+        self.state_dtype = state_dtype(grid_size, num_units)
+        # Spatial index: team * num_units + slot of the living unit standing on
+        # each cell, or NO_UNIT, so adjacency checks never scan the unit arrays
+        self.occupant = np.full((grid_size, grid_size), NO_UNIT, dtype=np.int32)
+        self._players = (PlayerView(self.units, 0), PlayerView(self.units, 1))
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    @property
+    def player1(self):
+        return self._players[0]
+
+    @property
+    def player2(self):
+        return self._players[1]
+
+    def reset(self, seed=None, scenario_id=None):
+        """
+        Start a new episode. scenario_id (an index or, for a ScenarioBank, a
+        name) resets to that map_pool map instead of drawing one from the RNG.
+        """
+        # Reseed only when asked, so consecutive episodes continue one stream
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+        # Walls and capture points (with their owner) live in their own layer;
+        # self.grid is that layer with living units drawn on top
+        if scenario_id is not None:
+            if self.map_pool is None:
+                raise ValueError("reset(scenario_id=...) needs a map_pool, e.g. a scenarios.ScenarioBank")
+            terrain, spawns = self.map_pool[scenario_id]
+        elif self.map_pool is not None:
+            terrain, spawns = self.map_pool.draw(self.rng)
+        else:
+            terrain, spawns = draw_map(
+                self.rng, self.grid_size, self.num_units, self.wall_density, self.capture_density
+            )
+        self.terrain = terrain.astype(np.int64)
+        self.grid = self.terrain.copy()
+
+        # Every unit gets its own spawn cell
+        self.occupant.fill(NO_UNIT)
+        for team, marker in enumerate((PLAYER1, PLAYER2)):
+            self.grid[spawns[team, :, 0], spawns[team, :, 1]] = marker
+            self.occupant[spawns[team, :, 0], spawns[team, :, 1]] = team * self.num_units + np.arange(self.num_units)
+        self.units.reset(spawns)
+
+        self._vacated = []
+        self._hit_rolls = None
+        self.turn = 0
+        if self.render_mode == "human":
+            self.render()
+        return self.get_observation_for_agent(True), self.get_observation_for_agent(False)
+
+    def get_state(self, out=None):
+        """
+        Pack everything step() depends on into one state_dtype record: terrain,
+        grid, unit arrays, capture counts, turn, the current hit-roll block and
+        the RNG state. out, if given, is a 0-d state_dtype array to fill; many
+        states can share one array, e.g. the nodes of a search tree.
+        """
+        state = np.zeros((), dtype=self.state_dtype) if out is None else out
+        state["terrain"] = self.terrain
+        state["grid"] = self.grid
+        state["positions"] = self.units.positions
+        state["health"] = self.units.health
+        state["capture_points"] = self.units.capture_points
+        state["turn"] = self.turn
+        state["has_rolls"] = self._hit_rolls is not None
+        if self._hit_rolls is not None:
+            np.less(self._hit_rolls, HIT_CHANCE, out=state["hits"])
+        bit_generator = self.rng.bit_generator.state
+        if bit_generator["bit_generator"] != "PCG64":
+            raise ValueError("get_state only supports the default PCG64 generator")
+        state["rng_state"] = np.frombuffer(bit_generator["state"]["state"].to_bytes(16, "little"), np.uint8)
+        state["rng_inc"] = np.frombuffer(bit_generator["state"]["inc"].to_bytes(16, "little"), np.uint8)
+        state["rng_has_uint32"] = bit_generator["has_uint32"]
+        state["rng_uinteger"] = bit_generator["uinteger"]
+        return state
+
+    def set_state(self, state):
+        """Restore a get_state record, or its bytes, into this env; the grid size and unit count must match"""
+        if not isinstance(state, (np.ndarray, np.void)):
+            state = np.frombuffer(state, dtype=self.state_dtype, count=1)[0]
+        if state.dtype != self.state_dtype:
+            raise ValueError("State was packed by an env with a different grid size or unit count")
+        self.terrain[:] = state["terrain"]
+        self.grid[:] = state["grid"]
+        self.units.positions[:] = state["positions"]
+        self.units.health[:] = state["health"]
+        self.units.capture_points[:] = state["capture_points"]
+        self.turn = int(state["turn"])
+        if state["has_rolls"]:
+            if self._hit_rolls is None:
+                self._hit_rolls = np.empty(state["hits"].shape)
+            # Hits become 0.0 and misses 1.0, which compare with HIT_CHANCE like the original rolls
+            np.logical_not(state["hits"], out=self._hit_rolls, casting="unsafe")
+        else:
+            self._hit_rolls = None
+        self.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {
+                "state": int.from_bytes(state["rng_state"].tobytes(), "little"),
+                "inc": int.from_bytes(state["rng_inc"].tobytes(), "little"),
+            },
+            "has_uint32": int(state["rng_has_uint32"]),
+            "uinteger": int(state["rng_uinteger"]),
+        }
+        self._vacated = []
+
+        # The spatial index follows from the living units' positions
+        self.occupant.fill(NO_UNIT)
+        alive = self.units.alive
+        team, slot = np.nonzero(alive)
+        positions = self.units.positions[alive]
+        self.occupant[positions[:, 0], positions[:, 1]] = team * self.num_units + slot
+
+    def clone(self):
+        """
+        Independent copy of this env for branching, made by copying its
+        arrays rather than by deepcopy or a reset. The clone renders nothing
+        and has no profiler. Planners that branch in a tight loop should keep
+        a few envs around and set_state() into them, which skips creating
+        a new Generator.
+        """
+        env = CombatArenaEnv.__new__(CombatArenaEnv)
+        env.__dict__.update(self.__dict__)
+        env.render_mode = None
+        env._renderer = None
+        env._figure = None
+        env.profiler = None
+        env.terrain = self.terrain.copy()
+        env.grid = self.grid.copy()
+        env.occupant = self.occupant.copy()
+        env.units = self.units.copy()
+        env._players = (PlayerView(env.units, 0), PlayerView(env.units, 1))
+        env._vacated = []
+        env._hit_rolls = None if self._hit_rolls is None else self._hit_rolls.copy()
+        env.rng = np.random.Generator(type(self.rng.bit_generator)())
+        env.rng.bit_generator.state = self.rng.bit_generator.state
+        env.visibility = VisibilityEngine(self.grid_size, VISION_RANGE, WALL)
+        env._obs_buffers = [np.empty_like(buffer) for buffer in self._obs_buffers]
+        return env
+
+    def _update_grid_positions(self):
+        """Restore the terrain under cells vacated this turn by units that moved or died"""
+        for x, y in self._vacated:
+            self.grid[x, y] = self.terrain[x, y]
+        self._vacated.clear()
+
+    def get_observation_for_agent(self, is_agent_one=True):
+        """Get observation with limited visibility for each unit"""
+        team = 0 if is_agent_one else 1
+        positions = self.units.positions[team].copy()
+        health = self.units.health[team].copy()
+        opponent_positions = self.units.positions[1 - team].copy()
+        opponent_health = self.units.health[1 - team].copy()
+        alive = health > 0
+
+        # Combine visible areas from all living units in one pass
+        out = self._obs_buffers[team] if self.reuse_buffers else None
+        combined_visibility, vision = self.visibility.observe(self.grid, positions[alive], out=out)
+
+        opponent_visible = (opponent_health > 0) & vision[opponent_positions[:, 0], opponent_positions[:, 1]]
+        # Hidden opponents are masked as in BatchedCombatArenaEnv, so the arrays keep the fog of war
+        hidden = ~opponent_visible
+        opponent_positions[hidden] = -1
+        opponent_health[hidden] = 0
+
+        observation = {
+            "grid": combined_visibility,  # Limited visibility grid
+            "units": UnitList(positions, health, self.units.ids[team]),
+            "visible_opponents": UnitList(
+                opponent_positions, opponent_health, self.units.ids[1 - team],
+                np.flatnonzero(opponent_visible)
+            ),
+            "capture_points": int(self.units.capture_points[team]),
+            "turn": self.turn,
+            # Array form of the same data, indexed by unit slot
+            "unit_positions": positions,
+            "unit_health": health,
+            "opponent_positions": opponent_positions,
+            "opponent_health": opponent_health,
+            "opponent_visible": opponent_visible
+        }
+        if self.ego_patches:
+            # Each unit's own (2*VISION_RANGE+1)^2 window, WALL past the map edge
+            observation["patches"] = self.visibility.patches(self.grid, positions, alive)
+        return observation
+
+    def _process_action(self, team, slot, action):
+        reward = 0
+        units = self.units
+        # Get current position
+        x, y = units.positions[team, slot]
+        is_player1 = team == 0
+
+        # Movement: compute new position
+        if action in MOVE_OFFSETS:
+            dx, dy = MOVE_OFFSETS[action]
+            new_x, new_y = x + dx, y + dy
+
+            # Check boundaries and obstacles
+            if 0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size:
+                if self.grid[new_x, new_y] not in [WALL, PLAYER1, PLAYER2]:
+                    units.positions[team, slot] = (new_x, new_y)
+                    # The old cell stays blocked until the end of the turn
+                    self._vacated.append((x, y))
+                    self.occupant[new_x, new_y] = self.occupant[x, y]
+                    self.occupant[x, y] = NO_UNIT
+                    if self.terrain[new_x, new_y] == CAPTURE_NEUTRAL:
+                        self.terrain[new_x, new_y] = CAPTURE_P1 if is_player1 else CAPTURE_P2
+                        reward += CAPTURE_REWARD
+                        units.capture_points[team] += 1
+                    self.grid[new_x, new_y] = PLAYER1 if is_player1 else PLAYER2
+
+                else:
+                    reward += BLOCKED_MOVE_REWARD  # penalty for invalid move
+            else:
+                reward += BLOCKED_MOVE_REWARD  # penalty for moving out of bounds
+
+        elif action == ATTACK:
+        # Check for adjacent enemy units and attack if found
+            attack_successful = False
+            opponent_health = units.health[1 - team]
+            # Adjacent opponents from the spatial index, tried in slot order
+            first, last = (1 - team) * units.num_units, (2 - team) * units.num_units
+            targets = []
+            for dx, dy in NEIGHBOUR_OFFSETS:
+                opp_x, opp_y = x + dx, y + dy
+                if 0 <= opp_x < self.grid_size and 0 <= opp_y < self.grid_size:
+                    occupant = self.occupant[opp_x, opp_y]
+                    if first <= occupant < last:
+                        targets.append((occupant - first, opp_x, opp_y))
+            targets.sort()
+            for roll, (opponent, opp_x, opp_y) in zip(self._turn_rolls[team, slot], targets):
+                if roll < HIT_CHANCE:  # 70% hit chance
+                    opponent_health[opponent] -= ATTACK_DAMAGE
+                    if opponent_health[opponent] <= 0:
+                        self._vacated.append((opp_x, opp_y))
+                        self.occupant[opp_x, opp_y] = NO_UNIT
+                    reward += HIT_REWARD
+                    attack_successful = True
+                    break  # Only attack one enemy per action
+
+            if not attack_successful:
+                reward += MISS_REWARD  # Penalty for invalid attack
+
+        return reward
+
+    def _unit_actions(self, team, actions):
+        """Yield (slot, action) pairs from a dict keyed by unit id or slot, or a per-slot sequence"""
+        if isinstance(actions, dict):
+            for unit_id, action in actions.items():
+                slot = self.units.slot_of(team, unit_id)
+                if slot is not None:
+                    yield slot, action
+        else:
+            yield from enumerate(actions)
+
+    def _resolve_simultaneous(self, unit_actions):
+        """
+        Apply every unit's action at once, all against the state at the start
+        of the turn, and return both players' rewards.
+
+        Attacks pick targets exactly as in _process_action, and all damage
+        lands together, so two units can kill each other. Units that die this
+        turn do not move. A move fails (BLOCKED_MOVE_REWARD) when its cell is
+        off the map, a wall, or held by any unit at the start of the turn,
+        which also rules out two units swapping places. It also fails when
+        another unit moves to the same cell.
+        """
+        units = self.units
+        num_units = units.num_units
+        size = self.grid_size
+        profiler = self.profiler
+        codes = np.full((2, num_units), DEFEND, dtype=np.int64)
+        for team in range(2):
+            for slot, action in unit_actions[team]:
+                codes[team, slot] = action
+        alive = units.alive
+        x, y = units.positions[..., 0], units.positions[..., 1]
+        unit_rewards = np.zeros((2, num_units), dtype=np.int64)
+
+        # Attacks: adjacent opponents from the spatial index, in slot order,
+        # each using the attacker's next roll; the first landed roll is a hit
+        team, slot = np.nonzero(alive & (codes == ATTACK))
+        if team.size:
+            neighbour_x = x[team, slot, None] + _NEIGHBOUR_DX
+            neighbour_y = y[team, slot, None] + _NEIGHBOUR_DY
+            inside = (neighbour_x >= 0) & (neighbour_x < size) & (neighbour_y >= 0) & (neighbour_y < size)
+            occupant = self.occupant[np.clip(neighbour_x, 0, size - 1), np.clip(neighbour_y, 0, size - 1)]
+            occupant = occupant - ((1 - team) * num_units)[:, None]
+            adjacent = inside & (occupant >= 0) & (occupant < num_units)
+            targets = np.sort(np.where(adjacent, occupant, num_units), axis=1)
+            landed = (targets < num_units) & (self._turn_rolls[team, slot] < HIT_CHANCE)
+            hit = landed.any(axis=1)
+            np.subtract.at(units.health, (1 - team[hit], targets[hit, landed[hit].argmax(axis=1)]), ATTACK_DAMAGE)
+            unit_rewards[team, slot] = np.where(hit, HIT_REWARD, MISS_REWARD)
+        if profiler is not None:
+            profiler.lap("attack")
+
+        # Moves: validate against the start-of-turn grid, then drop contested cells
+        team, slot = np.nonzero((units.health > 0) & (codes >= MOVE_NO) & (codes <= MOVE_RIGHT))
+        old_x, old_y = x[team, slot], y[team, slot]
+        new_x = old_x + _MOVE_DX[codes[team, slot] + 1]
+        new_y = old_y + _MOVE_DY[codes[team, slot] + 1]
+        inside = (new_x >= 0) & (new_x < size) & (new_y >= 0) & (new_y < size)
+        destination = self.grid[np.clip(new_x, 0, size - 1), np.clip(new_y, 0, size - 1)]
+        valid = inside & (destination != WALL) & (destination != PLAYER1) & (destination != PLAYER2)
+        _, group, claims = np.unique((new_x * size + new_y)[valid], return_inverse=True, return_counts=True)
+        moved = valid.copy()
+        moved[valid] = claims[group.reshape(-1)] == 1
+        unit_rewards[team[~moved], slot[~moved]] += BLOCKED_MOVE_REWARD
+
+        # Everyone who died or moved leaves their cell, then movers arrive
+        killed = alive & (units.health <= 0)
+        for cells_x, cells_y in ((x[killed], y[killed]), (old_x[moved], old_y[moved])):
+            self.grid[cells_x, cells_y] = self.terrain[cells_x, cells_y]
+            self.occupant[cells_x, cells_y] = NO_UNIT
+        team, slot, new_x, new_y = team[moved], slot[moved], new_x[moved], new_y[moved]
+        captured = self.terrain[new_x, new_y] == CAPTURE_NEUTRAL
+        self.terrain[new_x[captured], new_y[captured]] = CAPTURE_P1 + team[captured]
+        np.add.at(units.capture_points, team[captured], 1)
+        unit_rewards[team[captured], slot[captured]] += CAPTURE_REWARD
+        self.grid[new_x, new_y] = PLAYER1 + team
+        self.occupant[new_x, new_y] = team * num_units + slot
+        units.positions[team, slot, 0] = new_x
+        units.positions[team, slot, 1] = new_y
+        if profiler is not None:
+            profiler.lap("move")
+        return [int(reward) for reward in unit_rewards.sum(axis=1)]
+
+    def step(self, actions):
+        """
+        Expects a tuple of actions (actions_p1, actions_p2)
+        Each entry is a dictionary mapping unit IDs (or integer unit slots) to
+        their actions, or a sequence of actions indexed by unit slot
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_step()
+        rewards = [0, 0]
+        health = self.units.health
+
+        block_turn = self.turn % ROLL_BLOCK_TURNS
+        if block_turn == 0:
+            self._hit_rolls = self.rng.random((ROLL_BLOCK_TURNS, 2, self.units.num_units, MAX_ADJACENT))
+        self._turn_rolls = self._hit_rolls[block_turn]
+        unit_actions = [list(self._unit_actions(team, actions[team])) for team in range(2)]
+        if profiler is not None:
+            profiler.lap("dispatch")
+
+        if self.rules == "simultaneous":
+            rewards = self._resolve_simultaneous(unit_actions)
+        else:
+            # Process actions for player 1's units, then player 2's
+            for team in range(2):
+                for slot, action in unit_actions[team]:
+                    if health[team, slot] > 0:
+                        rewards[team] += self._process_action(team, slot, action)
+                        if profiler is not None:
+                            profiler.lap("attack" if action == ATTACK else "move")
+
+        self._update_grid_positions()
+        self.turn += 1
+        if profiler is not None:
+            profiler.lap("update_grid")
+
+        # Check if game is over
+        p1_alive, p2_alive = self.units.alive.any(axis=1)
+        done = self.turn >= self.max_turns or not p1_alive or not p2_alive
+        if profiler is not None:
+            profiler.lap("done_check")
+
+        if self.render_mode == "human":
+            self.render()
+            if profiler is not None:
+                profiler.lap("render")
+
+        observations = self.get_observation_for_agent(True), self.get_observation_for_agent(False)
+        if profiler is not None:
+            profiler.lap("observe")
+            profiler.end_step()
+        return observations[0], observations[1], rewards, done, {}
+
+    def render(self):
+        """Return the current frame as an RGB array, and draw it when render_mode is "human" """
+        if self.render_mode is None:
+            return None
+        frame = self.render_rgb()
+        if self.render_mode == "human":
+            if self._figure is None:
+                import matplotlib.pyplot as plt
+                self._figure = plt.subplots(figsize=(10, 12))
+            fig, ax = self._figure
+            self.render_graphic(ax, fig, frame)
+        return frame
+
+    def render_rgb(self, cell_size=None):
+        """Render the grid and units into an RGB NumPy array"""
+        if self._renderer is None or (cell_size is not None and cell_size != self._renderer.cell_size):
+            self._renderer = RasterRenderer(self.grid_size, cell_size or CELL_SIZE, INITIAL_HEALTH)
+        return self._renderer.render(self.grid, self.units.positions, self.units.health)
+
+    def render_graphic(self, ax=None, fig=None, frame=None):
+
+        """Render the game state with multiple units; frame is a render_rgb() image of it, if one is at hand"""
+        # matplotlib is only imported once something is drawn with it
+        import matplotlib.pyplot as plt
+
+        # If no axis is provided, create new figure
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(10, 12))  # Increased height for unit info
+
+        # Clear previous plots
+        ax.clear()
+
+        # Draw the whole grid as one image
+        if frame is None:
+            frame = self.render_rgb()
+        ax.imshow(frame, extent=(0, self.grid_size, 0, self.grid_size), interpolation="nearest")
+
+        # Set axis properties
+        ax.set_xlim(0, self.grid_size)
+        ax.set_ylim(0, self.grid_size)
+        ax.set_xticks(range(self.grid_size))
+        ax.set_yticks(range(self.grid_size))
+        ax.set_xticklabels([])
+        ax.set_yticklabels([])
+        ax.set_aspect("equal")
+
+        # Create status text for units
+        p1_status = "Player A Units:\n" + "\n".join(
+            f"Unit {u['id'][-1]}: HP={u['health']}" 
+            for u in self.player1["units"]
+        )
+        p2_status = "Player B Units:\n" + "\n".join(
+            f"Unit {u['id'][-1]}: HP={u['health']}" 
+            for u in self.player2["units"]
+        )
+
+        # Update title with game info
+        title_text = (
+            f"Turn: {self.turn}\n"
+            f"Player A Points: {self.player1['capture_points']} | "
+            f"Player B Points: {self.player2['capture_points']}\n"
+            f"{p1_status}\n\n{p2_status}"
+        )
+        ax.set_title(title_text, pad=20, loc='left')
+
+        # Only draw if in interactive mode
+        if plt.isinteractive():
+            fig.canvas.draw()
+            fig.canvas.flush_events()
\ No newline at end of file
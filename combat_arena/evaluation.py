@@ -0,0 +1,242 @@
+"""
+Evaluation sweeps: many matchups between agents, played in parallel, with
+per-episode stats kept in columnar arrays and aggregated online.
+
+    python -m combat_arena.evaluation --episodes 2000 --processes 8
+
+Agents are given as factories, called as factory(seed=...) in the worker
+processes, so they must be picklable: a class such as MultiUnitAgent, or a
+functools.partial over one. Each matchup plays its episodes in blocks; agent
+A takes player 1 in even episodes and player 2 in odd ones, so neither agent
+gets the first-mover advantage of the sequential rules. Stats are always
+from A's point of view.
+
+An episode is won by the side with units left when the other is wiped out;
+if both survive, more capture points wins, then more total health; if that
+is also equal, it is a draw.
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+
+import numpy as np
+
+from .env import CombatArenaEnv
+from .agent import MultiUnitAgent
+from .pathfinding import PathfindingAgent
+
+EPISODE_STATS = np.dtype([
+    ("matchup", np.int32),
+    ("episode", np.int32),
+    ("a_side", np.int8),      # 0 when agent A played player 1
+    ("score", np.float32),    # 1 A won, 0.5 draw, 0 B won
+    ("turns", np.int16),
+    ("a_captures", np.int16),
+    ("b_captures", np.int16),
+    ("a_damage", np.int32),   # health A's units took off B's
+    ("b_damage", np.int32),
+    ("a_alive", np.int16),
+    ("b_alive", np.int16),
+])
+# Columns averaged with confidence intervals in the summary
+MEAN_COLUMNS = ("score", "turns", "a_captures", "b_captures", "a_damage", "b_damage", "a_alive", "b_alive")
+
+BLOCK_EPISODES = 64
+Z_95 = 1.96
+ELO_K = 16
+ELO_START = 1000.0
+
+DEFAULT_AGENTS = {"greedy": MultiUnitAgent, "pathfinding": PathfindingAgent}
+
+
+def play_block(task):
+    """Play episodes [first, first + count) of one matchup; returns EPISODE_STATS rows"""
+    matchup, factory_a, factory_b, first, count, seed, env_kwargs = task
+    env = CombatArenaEnv(**env_kwargs)
+    rows = np.zeros(count, dtype=EPISODE_STATS)
+    for row, episode in zip(rows, range(first, first + count)):
+        episode_seed = seed + episode
+        agent_a, agent_b = factory_a(seed=3 * episode_seed + 1), factory_b(seed=3 * episode_seed + 2)
+        a_side = episode % 2
+        agents = (agent_a, agent_b) if a_side == 0 else (agent_b, agent_a)
+        observations = env.reset(seed=episode_seed)
+        done = False
+        while not done:
+            actions = (agents[0].select_actions(observations[0]), agents[1].select_actions(observations[1]))
+            obs_1, obs_2, _, done, _ = env.step(actions)
+            observations = (obs_1, obs_2)
+
+        health = np.clip(env.units.health, 0, None)
+        alive = env.units.alive.sum(axis=1)
+        captures = env.units.capture_points
+        damage = health.shape[1] * env.units.initial_health - health.sum(axis=1)[::-1]
+        if alive.all():
+            keys = np.stack([captures, health.sum(axis=1)], axis=1)
+            first_key = np.flatnonzero(keys[0] != keys[1])
+            sides = 0.5 if first_key.size == 0 else float(keys[0, first_key[0]] > keys[1, first_key[0]])
+        else:
+            sides = 0.5 if not alive.any() else float(alive[0] > 0)
+        a, b = a_side, 1 - a_side
+        row["matchup"] = matchup
+        row["episode"] = episode
+        row["a_side"] = a_side
+        row["score"] = sides if a_side == 0 else 1 - sides
+        row["turns"] = env.turn
+        row["a_captures"], row["b_captures"] = captures[a], captures[b]
+        row["a_damage"], row["b_damage"] = damage[a], damage[b]
+        row["a_alive"], row["b_alive"] = alive[a], alive[b]
+    return rows
+
+
+class EvaluationStats:
+    """
+    Streaming aggregates per matchup: counts, wins/draws, means and variances
+    of MEAN_COLUMNS (merged block by block with Chan's parallel update), and
+    Elo ratings updated episode by episode in arrival order. With
+    keep_episodes, every EPISODE_STATS row is also kept in self.episodes.
+    """
+
+    def __init__(self, matchups, keep_episodes=False):
+        self.matchups = list(matchups)
+        shape = (len(self.matchups), len(MEAN_COLUMNS))
+        self.count = np.zeros(len(self.matchups), dtype=np.int64)
+        self.wins = np.zeros(len(self.matchups), dtype=np.int64)
+        self.draws = np.zeros(len(self.matchups), dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.ratings = {name: ELO_START for pair in self.matchups for name in pair}
+        self.keep_episodes = keep_episodes
+        self._blocks = []
+
+    def update(self, rows):
+        if self.keep_episodes:
+            self._blocks.append(rows)
+        values = np.stack([rows[column].astype(np.float64) for column in MEAN_COLUMNS], axis=1)
+        for matchup in np.unique(rows["matchup"]):
+            selected = rows["matchup"] == matchup
+            block = values[selected]
+            n_a, n_b = self.count[matchup], len(block)
+            block_mean = block.mean(axis=0)
+            delta = block_mean - self.mean[matchup]
+            total = n_a + n_b
+            self.mean[matchup] += delta * n_b / total
+            self.m2[matchup] += ((block - block_mean) ** 2).sum(axis=0) + delta ** 2 * n_a * n_b / total
+            self.count[matchup] = total
+            scores = rows["score"][selected]
+            self.wins[matchup] += int((scores == 1).sum())
+            self.draws[matchup] += int((scores == 0.5).sum())
+
+            name_a, name_b = self.matchups[matchup]
+            for score in scores.tolist():
+                expected = 1 / (1 + 10 ** ((self.ratings[name_b] - self.ratings[name_a]) / 400))
+                self.ratings[name_a] += ELO_K * (score - expected)
+                self.ratings[name_b] -= ELO_K * (score - expected)
+
+    @property
+    def episodes(self):
+        return np.concatenate(self._blocks) if self._blocks else np.zeros(0, dtype=EPISODE_STATS)
+
+    def wilson_interval(self, matchup, z=Z_95):
+        """Confidence interval of A's win-or-draw-half score, treating it as a rate"""
+        n = self.count[matchup]
+        if n == 0:
+            return 0.0, 1.0
+        p = self.mean[matchup, MEAN_COLUMNS.index("score")]
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        spread = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return centre - spread, centre + spread
+
+    def summary(self, z=Z_95):
+        """One dict per matchup: counts, win/draw rates, and mean and CI half-width of each column"""
+        records = []
+        for matchup, (name_a, name_b) in enumerate(self.matchups):
+            n = int(self.count[matchup])
+            record = {"agent_a": name_a, "agent_b": name_b, "episodes": n,
+                      "a_win_rate": self.wins[matchup] / n if n else 0.0,
+                      "draw_rate": self.draws[matchup] / n if n else 0.0}
+            record["score_low"], record["score_high"] = self.wilson_interval(matchup, z)
+            variance = self.m2[matchup] / (n - 1) if n > 1 else np.zeros(len(MEAN_COLUMNS))
+            for column, mean, var in zip(MEAN_COLUMNS, self.mean[matchup], variance):
+                record[column] = float(mean)
+                record[column + "_ci"] = float(z * math.sqrt(var / n)) if n else 0.0
+            records.append(record)
+        return records
+
+    def table(self):
+        """Compact text table of the summary, followed by Elo ratings"""
+        header = (f"{'A':>12} {'B':>12} {'eps':>6} {'A win':>6} {'draw':>5} {'score (95% CI)':>18} "
+                  f"{'turns':>6} {'A caps':>7} {'B caps':>7} {'A dmg':>7} {'B dmg':>7}")
+        lines = [header, "-" * len(header)]
+        for record in self.summary():
+            lines.append(
+                f"{record['agent_a']:>12} {record['agent_b']:>12} {record['episodes']:>6} "
+                f"{record['a_win_rate']:>6.1%} {record['draw_rate']:>5.1%} "
+                f"{record['score']:>6.3f} [{record['score_low']:.3f},{record['score_high']:.3f}] "
+                f"{record['turns']:>6.1f} {record['a_captures']:>7.2f} {record['b_captures']:>7.2f} "
+                f"{record['a_damage']:>7.1f} {record['b_damage']:>7.1f}"
+            )
+        lines.append("")
+        lines.append("Elo: " + ", ".join(
+            f"{name} {rating:.0f}" for name, rating in sorted(self.ratings.items(), key=lambda item: -item[1])
+        ))
+        return "\n".join(lines)
+
+
+def evaluate(agents=None, matchups=None, episodes=1000, processes=None, seed=0, block_episodes=BLOCK_EPISODES,
+             keep_episodes=False, start_method=None, **env_kwargs):
+    """
+    Play `episodes` episodes of each matchup, a (name_a, name_b) pair of
+    keys of agents (every pair of distinct agents by default). env_kwargs go
+    to CombatArenaEnv. Returns an EvaluationStats. processes=1 plays
+    everything in this process.
+    """
+    agents = DEFAULT_AGENTS if agents is None else agents
+    if matchups is None:
+        names = list(agents)
+        matchups = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    stats = EvaluationStats(matchups, keep_episodes)
+    tasks = [
+        (matchup, agents[name_a], agents[name_b], first, min(block_episodes, episodes - first),
+         seed + 1_000_003 * matchup, env_kwargs)
+        for first in range(0, episodes, block_episodes)
+        for matchup, (name_a, name_b) in enumerate(matchups)
+    ]
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        for task in tasks:
+            stats.update(play_block(task))
+        return stats
+    with mp.get_context(start_method).Pool(processes) as pool:
+        # imap keeps results in task order, so Elo does not depend on scheduling
+        for rows in pool.imap(play_block, tasks):
+            stats.update(rows)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the built-in agents against each other")
+    parser.add_argument("--episodes", type=int, default=1000, help="episodes per matchup")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--grid-size", type=int)
+    parser.add_argument("--num-units", type=int)
+    parser.add_argument("--rules", choices=("sequential", "simultaneous"))
+    parser.add_argument("--csv", help="also write the per-episode stats to this CSV file")
+    args = parser.parse_args()
+    env_kwargs = {
+        key: value for key, value in
+        (("grid_size", args.grid_size), ("num_units", args.num_units), ("rules", args.rules))
+        if value is not None
+    }
+    stats = evaluate(episodes=args.episodes, processes=args.processes, seed=args.seed,
+                     keep_episodes=args.csv is not None, **env_kwargs)
+    print(stats.table())
+    if args.csv:
+        episodes = stats.episodes
+        np.savetxt(args.csv, np.array(episodes.tolist()), delimiter=",", header=",".join(EPISODE_STATS.names),
+                   comments="", fmt="%g")
+
+
+if __name__ == "__main__":
+    main()
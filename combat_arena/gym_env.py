@@ -0,0 +1,144 @@
+import gymnasium
+import numpy as np
+from gymnasium import spaces
+
+try:
+    from pettingzoo import ParallelEnv
+except ImportError:  # pettingzoo is only needed for CombatArenaParallelEnv
+    ParallelEnv = object
+
+from .constants import GRID_SIZE, MAX_TURNS, MAX_UNITS, INITIAL_HEALTH
+from .env import CombatArenaEnv
+from .agent import MultiUnitAgent
+from .encoding import (
+    NUM_ACTIONS, allocate_observation, encode_observation, decode_actions, observation_shapes
+)
+
+AGENTS = ("player_1", "player_2")
+
+
+def make_observation_space(grid_size, num_units=MAX_UNITS, max_turns=MAX_TURNS):
+    """Dict space matching encoding.allocate_observation"""
+    shapes = observation_shapes(grid_size, num_units)
+    high_coord = max(grid_size - 1, INITIAL_HEALTH)
+    return spaces.Dict({
+        "grid": spaces.Box(0, 1, *shapes["grid"]),
+        "units": spaces.Box(0, high_coord, *shapes["units"]),
+        "opponents": spaces.Box(0, high_coord, *shapes["opponents"]),
+        "alive_mask": spaces.Box(0, 1, *shapes["alive_mask"]),
+        "stats": spaces.Box(0, max(max_turns, grid_size * grid_size), *shapes["stats"]),
+    })
+
+
+def make_action_space(num_units=MAX_UNITS):
+    """One encoding.ACTION_TABLE index per unit slot"""
+    return spaces.MultiDiscrete(np.full(num_units, NUM_ACTIONS))
+
+
+class CombatArenaGymEnv(gymnasium.Env):
+    """
+    Single-agent Gymnasium view of CombatArenaEnv.
+
+    The learner controls player 1 through an int action vector of length
+    num_units; player 2 is driven by opponent (a MultiUnitAgent by default),
+    which receives the env's regular dict observations. reset(seed=...)
+    seeds the env with seed and an opponent with a seed() method with seed + 1.
+    With a map_pool (e.g. a scenarios.ScenarioBank), reset(options={"scenario_id": ...})
+    starts from that scenario.
+    """
+
+    metadata = dict(CombatArenaEnv.metadata)
+
+    def __init__(self, grid_size=GRID_SIZE, max_turns=MAX_TURNS, opponent=None, render_mode=None,
+                 num_units=MAX_UNITS, map_pool=None):
+        self.render_mode = render_mode
+        self.env = CombatArenaEnv(grid_size, max_turns, reuse_buffers=True, render_mode=render_mode,
+                                  num_units=num_units, map_pool=map_pool)
+        self.opponent = opponent if opponent is not None else MultiUnitAgent(name="Opponent")
+        self.observation_space = make_observation_space(grid_size, num_units, max_turns)
+        self.action_space = make_action_space(num_units)
+        self._observation = allocate_observation(grid_size, num_units)
+        self._opponent_observation = None
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        if seed is not None and hasattr(self.opponent, "seed"):
+            self.opponent.seed(seed + 1)
+        scenario_id = (options or {}).get("scenario_id")
+        obs_1, self._opponent_observation = self.env.reset(seed=seed, scenario_id=scenario_id)
+        return self._encode(obs_1), {}
+
+    def step(self, action):
+        opponent_actions = self.opponent.select_actions(self._opponent_observation)
+        obs_1, self._opponent_observation, rewards, done, info = self.env.step(
+            (decode_actions(action), opponent_actions)
+        )
+        truncated = done and self.env.units.alive.any(axis=1).all()
+        info = dict(info, opponent_reward=rewards[1])
+        return self._encode(obs_1), rewards[0], done and not truncated, truncated, info
+
+    def render(self):
+        return self.env.render()
+
+    def _encode(self, observation):
+        # Copy so callers can keep observations across steps
+        encoded = encode_observation(observation, 0, self._observation)
+        return {key: value.copy() for key, value in encoded.items()}
+
+
+class CombatArenaParallelEnv(ParallelEnv):
+    """PettingZoo parallel API over CombatArenaEnv, one agent per player"""
+
+    metadata = dict(CombatArenaEnv.metadata, name="combat_arena_v0")
+
+    def __init__(self, grid_size=GRID_SIZE, max_turns=MAX_TURNS, render_mode=None, num_units=MAX_UNITS,
+                 map_pool=None):
+        self.render_mode = render_mode
+        self.env = CombatArenaEnv(grid_size, max_turns, reuse_buffers=True, render_mode=render_mode,
+                                  num_units=num_units, map_pool=map_pool)
+        self.possible_agents = list(AGENTS)
+        self.agents = []
+        self._observation_space = make_observation_space(grid_size, num_units, max_turns)
+        self._action_space = make_action_space(num_units)
+        self._observations = [allocate_observation(grid_size, num_units) for _ in AGENTS]
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    def reset(self, seed=None, options=None):
+        self.agents = list(self.possible_agents)
+        observations = self.env.reset(seed=seed, scenario_id=(options or {}).get("scenario_id"))
+        return self._encode(observations), {agent: {} for agent in self.agents}
+
+    def render(self):
+        return self.env.render()
+
+    def step(self, actions):
+        env_actions = tuple(
+            decode_actions(actions[agent]) if agent in actions else ()
+            for agent in self.possible_agents
+        )
+        obs_1, obs_2, rewards, done, info = self.env.step(env_actions)
+        truncated = done and self.env.units.alive.any(axis=1).all()
+
+        agents = self.agents
+        observations = self._encode((obs_1, obs_2))
+        reward_map = {agent: rewards[i] for i, agent in enumerate(self.possible_agents)}
+        terminations = {agent: done and not truncated for agent in agents}
+        truncations = {agent: truncated for agent in agents}
+        infos = {agent: dict(info) for agent in agents}
+        if done:
+            self.agents = []
+        return observations, reward_map, terminations, truncations, infos
+
+    def _encode(self, observations):
+        return {
+            agent: {
+                key: value.copy()
+                for key, value in encode_observation(observations[team], team, self._observations[team]).items()
+            }
+            for team, agent in enumerate(self.possible_agents)
+        }
@@ -0,0 +1,130 @@
+import numpy as np
+
+from .constants import EMPTY, WALL, CAPTURE_NEUTRAL, WALL_DENSITY, CAPTURE_DENSITY
+
+MAX_ATTEMPTS = 100
+UNREACHABLE = -1
+
+
+def distance_field(passable, sources):
+    """
+    Breadth-first step counts from any source cell over 4-connected passable
+    cells, computed one frontier at a time with whole-array operations.
+    Cells that cannot be reached hold UNREACHABLE.
+    """
+    distances = np.full(passable.shape, UNREACHABLE, dtype=np.int32)
+    frontier = sources & passable
+    grown = np.empty_like(frontier)
+    distance = 0
+    while frontier.any():
+        distances[frontier] = distance
+        grown.fill(False)
+        grown[1:] |= frontier[:-1]
+        grown[:-1] |= frontier[1:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & passable & (distances == UNREACHABLE)
+        distance += 1
+    return distances
+
+
+def spawns_connected(terrain, spawns):
+    """True if every spawn can walk to every other spawn"""
+    passable = terrain != WALL
+    start = np.zeros_like(passable)
+    start[spawns[0, 0, 0], spawns[0, 0, 1]] = True
+    reachable = distance_field(passable, start) != UNREACHABLE
+    return bool(reachable[spawns[..., 0], spawns[..., 1]].all())
+
+
+def generate_map(rng, grid_size, num_units, wall_density=WALL_DENSITY, capture_density=CAPTURE_DENSITY):
+    """
+    Draw walls, neutral capture points and both teams' spawns in one shot.
+
+    A single permutation of the cell indices is split into walls, capture
+    points and spawns, so every spawn lands on its own empty cell without
+    rejection sampling. Layouts whose spawns cannot all reach each other are
+    redrawn, up to MAX_ATTEMPTS times.
+
+    Returns an int8 (grid_size, grid_size) terrain grid and a (2, num_units, 2)
+    array of spawn cells, player 1 first.
+    """
+    num_cells = grid_size * grid_size
+    num_walls = int(num_cells * wall_density)
+    num_points = int(num_cells * capture_density)
+    num_spawns = 2 * num_units
+    if num_walls + num_points + num_spawns > num_cells:
+        raise ValueError(
+            f"A {grid_size}x{grid_size} grid cannot hold {num_walls} walls, "
+            f"{num_points} capture points and {num_spawns} units"
+        )
+
+    for _ in range(MAX_ATTEMPTS):
+        cells = rng.permutation(num_cells)[:num_walls + num_points + num_spawns]
+        terrain = np.full(num_cells, EMPTY, dtype=np.int8)
+        terrain[cells[:num_walls]] = WALL
+        terrain[cells[num_walls:num_walls + num_points]] = CAPTURE_NEUTRAL
+        terrain = terrain.reshape(grid_size, grid_size)
+
+        spawn_cells = cells[num_walls + num_points:]
+        spawns = np.stack(np.divmod(spawn_cells, grid_size), axis=-1).reshape(2, num_units, 2)
+        if spawns_connected(terrain, spawns):
+            return terrain, spawns
+
+    raise RuntimeError(f"No connected layout found in {MAX_ATTEMPTS} attempts; lower wall_density")
+
+
+def draw_map(rng, grid_size, num_units, wall_density=WALL_DENSITY, capture_density=CAPTURE_DENSITY):
+    """
+    Generate the map for the next episode of an env driven by rng. One
+    integer is drawn as the map seed, so rng advances by the same amount
+    however many attempts generate_map needs.
+
+    This pays for generation and the connectivity check on every reset;
+    envs that reset often should use a MapPool, whose resets only copy.
+    """
+    map_seed = int(rng.integers(2 ** 63))
+    return generate_map(np.random.default_rng(map_seed), grid_size, num_units, wall_density, capture_density)
+
+
+def check_map_pool(map_pool, grid_size, num_units):
+    """Raise ValueError unless map_pool (a MapPool, ScenarioBank or None) fits envs of this size"""
+    if map_pool is not None and (map_pool.grid_size, map_pool.num_units) != (grid_size, num_units):
+        raise ValueError(
+            f"map_pool holds {map_pool.grid_size}x{map_pool.grid_size} maps for {map_pool.num_units} units "
+            f"per team, not {grid_size}x{grid_size} for {num_units}"
+        )
+
+
+class MapPool:
+    """
+    A fixed set of pre-generated maps stacked into arrays, for envs that
+    should reset by copying rather than generating. Map i is generated from
+    np.random.default_rng(seed + i), so a pool is reproducible from its seed.
+
+    This is the fast path for training: with draw_map, map generation is
+    most of BatchedCombatArenaEnv.step's time once envs auto-reset often.
+    """
+
+    def __init__(self, size, grid_size, num_units, seed=0, wall_density=WALL_DENSITY,
+                 capture_density=CAPTURE_DENSITY):
+        self.grid_size = grid_size
+        self.num_units = num_units
+        maps = [
+            generate_map(np.random.default_rng(seed + i), grid_size, num_units, wall_density, capture_density)
+            for i in range(size)
+        ]
+        self.terrain = np.stack([terrain for terrain, _ in maps])
+        self.spawns = np.stack([spawns for _, spawns in maps])
+        self.terrain.flags.writeable = False
+        self.spawns.flags.writeable = False
+
+    def __len__(self):
+        return len(self.terrain)
+
+    def __getitem__(self, index):
+        return self.terrain[index], self.spawns[index]
+
+    def draw(self, rng):
+        """Pick a map with one draw from rng"""
+        return self[int(rng.integers(len(self)))]
@@ -0,0 +1,296 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .constants import FOG, WALL, CAPTURE_NEUTRAL, CAPTURE_P2, ATTACK, DEFEND, MOVES, RANDOM_MOVES, MOVE_OFFSETS
+from .mapgen import distance_field, UNREACHABLE
+
+# (dx, dy, move) for every move that changes cell
+NEIGHBOURS = tuple((*MOVE_OFFSETS[move], move) for move in MOVES)
+MAX_FIELDS = 64
+# Half-width of the first window nearest_step searches; it doubles until a target is inside
+SEARCH_RADIUS = 8
+# Visible opponents farther than this many steps are left to closer units
+CHASE_DISTANCE = 16
+
+
+def nearest_step(passable, position, targets, blocked=(), radius=SEARCH_RADIUS, max_distance=None):
+    """
+    Action code of the first move on a shortest path from position to the
+    nearest cell of the targets mask, or None if no target can be reached
+    (within max_distance steps, if given). Neighbours in blocked are never
+    taken as the first move.
+
+    The search grows one boolean frontier at a time from position and walks
+    back from the first target it reaches, so no distance field is built.
+    It runs in a window radius cells around position, which doubles while no
+    target lies within radius steps, so its cost follows the distance to the
+    nearest target rather than the map size.
+    """
+    x, y = position
+    size_x, size_y = passable.shape
+    if max_distance is not None:
+        radius = min(radius, max_distance)
+    while True:
+        x0, x1 = max(x - radius, 0), min(x + radius + 1, size_x)
+        y0, y1 = max(y - radius, 0), min(y + radius + 1, size_y)
+        whole_map = x0 == 0 and y0 == 0 and x1 == size_x and y1 == size_y
+        window_targets = targets[x0:x1, y0:y1]
+        reached = ~passable[x0:x1, y0:y1]
+        reached[x - x0, y - y0] = True
+        frontier = np.zeros_like(reached)
+        for dx, dy, action in NEIGHBOURS:
+            nx, ny = x + dx - x0, y + dy - y0
+            if 0 <= nx < x1 - x0 and 0 <= ny < y1 - y0 and not reached[nx, ny] and (x + dx, y + dy) not in blocked:
+                if window_targets[nx, ny]:
+                    return action
+                frontier[nx, ny] = True
+        reached |= frontier
+
+        # A path that leaves the window is longer than radius, so hits up to
+        # radius steps away are nearest; farther ones need a wider window
+        limit = max_distance if whole_map else radius
+        frontiers = [frontier]
+        while frontier.any() and (limit is None or len(frontiers) < limit):
+            grown = np.zeros_like(frontier)
+            grown[1:] |= frontier[:-1]
+            grown[:-1] |= frontier[1:]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & ~reached
+            reached |= frontier
+            hits = frontier & window_targets
+            if hits.any():
+                return _first_move(frontiers, np.argwhere(hits)[0], (x - x0, y - y0))
+            frontiers.append(frontier)
+        if whole_map or (max_distance is not None and radius >= max_distance):
+            return None
+        radius = 2 * radius if max_distance is None else min(2 * radius, max_distance)
+
+
+def _first_move(frontiers, cell, start):
+    """Walk back from cell through frontiers[-1], ..., frontiers[0] and return the move out of start"""
+    cx, cy = cell.tolist()
+    for frontier in reversed(frontiers):
+        cx, cy = next(
+            (cx - dx, cy - dy) for dx, dy, _ in NEIGHBOURS
+            if 0 <= cx - dx < frontier.shape[0] and 0 <= cy - dy < frontier.shape[1] and frontier[cx - dx, cy - dy]
+        )
+    return next(action for dx, dy, action in NEIGHBOURS if (start[0] + dx, start[1] + dy) == (cx, cy))
+
+
+class DistanceFieldCache:
+    """
+    BFS distance fields to single cells over a wall layout.
+
+    Fields only depend on walls, which never move, so the field to a cell
+    is computed once per map, kept under its flat cell index, and reused by
+    every unit and turn; units are treated as dynamic blockers at lookup
+    time instead (see next_step). At most max_fields are kept, least
+    recently used first out. Changing the walls drops every cached field.
+    """
+
+    def __init__(self, max_fields=MAX_FIELDS):
+        self.max_fields = max_fields
+        self.passable = None
+        self._fields = OrderedDict()
+
+    def set_walls(self, walls):
+        passable = ~np.asarray(walls, dtype=bool)
+        if self.passable is None or not np.array_equal(passable, self.passable):
+            self.passable = passable
+            self._fields.clear()
+
+    def field(self, cell):
+        """Distance from every cell to the (x, y) cell"""
+        key = cell[0] * self.passable.shape[1] + cell[1]
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+        sources = np.zeros_like(self.passable)
+        sources[cell] = True
+        field = distance_field(self.passable, sources)
+        self._fields[key] = field
+        if len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def next_step(self, field, position, blocked):
+        """
+        Action code of the move that gets closest to the field's target
+        without entering a cell in blocked, or None if no move gets closer.
+        """
+        x, y = position
+        size_x, size_y = field.shape
+        best, best_distance = None, field[x, y] if field[x, y] != UNREACHABLE else np.iinfo(field.dtype).max
+        for dx, dy, action in NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < size_x and 0 <= ny < size_y and (nx, ny) not in blocked:
+                distance = field[nx, ny]
+                if distance != UNREACHABLE and distance < best_distance:
+                    best, best_distance = action, distance
+        return best
+
+
+class PathfindingAgent:
+    """
+    Scripted agent that walks shortest paths around walls.
+
+    Units attack an adjacent visible opponent, otherwise head for the
+    nearest visible opponent within CHASE_DISTANCE steps, then for the nearest known neutral capture
+    point, then for the nearest unexplored cell. Capture points never move,
+    so paths to them follow cached distance fields; opponents and unexplored
+    cells change every turn and are found with a local search (nearest_step).
+
+    Call reset(walls) with the map's wall mask (e.g. env.terrain == WALL)
+    to plan on the full layout. Without it the agent plans on the walls it
+    has seen so far, treating unseen cells as open; memory is cleared when
+    a new episode starts (turn 0).
+
+    select_actions_batch plays many envs at once, e.g. both players of a
+    BatchedCombatArenaEnv, keeping a separate memory per env and player.
+    """
+
+    def __init__(self, name="PathfindingAgent", seed=None):
+        self.name = name
+        self.fields = DistanceFieldCache()
+        # Per-env agents used by select_actions_batch, keyed by team
+        self._batch_agents = {}
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        """Reset the agent's own random generator"""
+        self.rng = np.random.default_rng(seed)
+
+    def reset(self, walls=None):
+        """Forget the previous map; walls, if given, is the full wall layout"""
+        self._map_walls = None if walls is None else np.asarray(walls, dtype=bool)
+        self._walls = None
+        self._seen = None
+        self._neutral = None
+        self._fresh = True
+
+    def _remember(self, grid):
+        if self._seen is None or self._seen.shape != grid.shape:
+            self._seen = np.zeros(grid.shape, dtype=bool)
+            self._neutral = np.zeros(grid.shape, dtype=bool)
+            self._walls = self._map_walls.copy() if self._map_walls is not None else np.zeros(grid.shape, dtype=bool)
+        visible = grid != FOG
+        self._seen |= visible
+        self._walls |= grid == WALL
+        # Units hide the terrain under them, so only update cells we can see directly
+        terrain_visible = visible & (grid <= CAPTURE_P2)
+        self._neutral[terrain_visible] = grid[terrain_visible] == CAPTURE_NEUTRAL
+        self.fields.set_walls(self._walls)
+
+    def _capture_step(self, position, points, blocked):
+        """
+        Step toward a known neutral point: the nearest by local search when
+        one is close, otherwise the nearest reachable by Manhattan distance,
+        along its cached field
+        """
+        distances = np.abs(points - position).sum(axis=1)
+        if distances.min() <= SEARCH_RADIUS:
+            action = nearest_step(self.fields.passable, position, self._neutral, blocked, max_distance=SEARCH_RADIUS)
+            if action is not None:
+                return action
+        for point in points[np.argsort(distances, kind="stable")].tolist():
+            field = self.fields.field(tuple(point))
+            if field[position] != UNREACHABLE:
+                return self.fields.next_step(field, position, blocked)
+        return None
+
+    def select_actions(self, observation):
+        """
+        Returns a dictionary mapping unit IDs to actions
+        """
+        unit_ids = [unit["id"] for unit in observation["units"]]
+        slot_actions = self._slot_actions(
+            observation["turn"], observation["grid"], observation["unit_positions"], observation["unit_health"],
+            observation["opponent_positions"], observation["opponent_visible"]
+        )
+        return {unit_ids[slot]: action for slot, action in slot_actions.items()}
+
+    def select_actions_batch(self, observations, team=None):
+        """
+        Same policy as select_actions for many envs at once.
+
+        observations holds "grid" (N, H, W), "turn" (N,), "unit_positions",
+        "unit_health", "opponent_positions" and "opponent_visible" arrays, as
+        in the array entries of env observations. With team given, arrays
+        other than "turn" carry a player axis after the env axis, as in
+        BatchedCombatArenaEnv observations, and that team's slice is used.
+
+        Every (team, env) pair has its own map memory, cleared at its turn 0,
+        and plans on the walls it has seen. Random moves are drawn env by env
+        from this agent's generator. Returns an (N, units) int8 array of
+        action codes, DEFEND for dead units.
+        """
+        def take(key):
+            array = np.asarray(observations[key])
+            return array if team is None else array[:, team]
+
+        grids = take("grid")
+        positions = take("unit_positions")
+        health = take("unit_health")
+        opponent_positions = take("opponent_positions")
+        visible = take("opponent_visible")
+        turns = np.asarray(observations["turn"])
+
+        agents = self._batch_agents.get(team)
+        if agents is None or len(agents) != len(grids):
+            agents = self._batch_agents[team] = [PathfindingAgent(f"{self.name}[{i}]") for i in range(len(grids))]
+        actions = np.full(positions.shape[:2], DEFEND, dtype=np.int8)
+        for i, agent in enumerate(agents):
+            agent.rng = self.rng
+            slot_actions = agent._slot_actions(
+                int(turns[i]), grids[i], positions[i], health[i], opponent_positions[i], visible[i]
+            )
+            for slot, action in slot_actions.items():
+                actions[i, slot] = action
+        return actions
+
+    def _slot_actions(self, turn, grid, positions, health, opponent_positions, visible):
+        """Action of every living unit, keyed by slot, from one observation's arrays"""
+        if turn == 0 and not self._fresh:
+            self.reset()
+        self._fresh = False
+        self._remember(np.asarray(grid))
+
+        alive = health > 0
+        opponents = [tuple(p) for p in opponent_positions[visible].tolist()]
+
+        # Cells other units hold, or will move into this turn, are off limits
+        blocked = set(opponents)
+        blocked.update(tuple(p) for p in positions[alive].tolist())
+
+        passable = self.fields.passable
+        opponent_cells = np.zeros_like(passable)
+        for x, y in opponents:
+            opponent_cells[x, y] = True
+        neutral_points = np.argwhere(self._neutral)
+        unexplored = ~self._seen & passable
+        exploring = unexplored.any()
+
+        actions = {}
+        for slot in np.flatnonzero(alive):
+            position = tuple(positions[slot].tolist())
+            action = None
+            if opponents:
+                if min(abs(ox - position[0]) + abs(oy - position[1]) for ox, oy in opponents) == 1:
+                    action = ATTACK
+                else:
+                    action = nearest_step(passable, position, opponent_cells, blocked, max_distance=CHASE_DISTANCE)
+            if action is None and len(neutral_points):
+                action = self._capture_step(position, neutral_points, blocked)
+            if action is None and exploring:
+                action = nearest_step(passable, position, unexplored, blocked)
+            if action is None:
+                action = RANDOM_MOVES[self.rng.integers(len(RANDOM_MOVES))]
+            elif action != ATTACK:
+                dx, dy = MOVE_OFFSETS[action]
+                blocked.add((position[0] + dx, position[1] + dy))
+            actions[int(slot)] = action
+        return actions
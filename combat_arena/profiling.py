@@ -0,0 +1,132 @@
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+# Phases of CombatArenaEnv.step, in the order they run
+STEP_PHASES = ("dispatch", "move", "attack", "update_grid", "done_check", "render", "observe")
+
+
+class StepProfiler:
+    """
+    Opt-in per-phase timers and counters for CombatArenaEnv.step.
+
+    Pass one as CombatArenaEnv(profiler=...) or assign env.profiler; with
+    the default of None the step loop only pays for an `is not None` check.
+    Phases are timed as laps: each lap(phase) charges the time since the
+    previous lap to that phase, so timing costs one perf_counter call.
+
+    With track_allocations, tracemalloc is started and every step also
+    records its peak of newly allocated bytes and its net change in live
+    Python memory blocks. This is much slower than timing alone.
+
+    Every report_every steps (0 to disable) summary() is handed to each
+    exporter, e.g. a CsvExporter or JsonLinesExporter, or any callable.
+    """
+
+    def __init__(self, track_allocations=False, report_every=0, exporters=()):
+        self.track_allocations = track_allocations
+        self.report_every = report_every
+        self.exporters = list(exporters)
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        self.steps = 0
+        self.step_time = 0.0
+        self.phase_time = dict.fromkeys(STEP_PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(STEP_PHASES, 0)
+        self.counters = {}
+        self.alloc_bytes = 0
+        self.net_blocks = 0
+        self._first_start = None
+        self._last_end = None
+
+    def start_step(self):
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+            self._blocks_start = sys.getallocatedblocks()
+        self._step_start = self._lap = time.perf_counter()
+        if self._first_start is None:
+            self._first_start = self._step_start
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phase_time[phase] = self.phase_time.get(phase, 0.0) + now - self._lap
+        self.phase_calls[phase] = self.phase_calls.get(phase, 0) + 1
+        self._lap = now
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def end_step(self):
+        now = time.perf_counter()
+        self.step_time += now - self._step_start
+        self._last_end = now
+        self.steps += 1
+        if self.track_allocations:
+            self.alloc_bytes += tracemalloc.get_traced_memory()[1] - self._traced_start
+            self.net_blocks += sys.getallocatedblocks() - self._blocks_start
+        if self.report_every and self.steps % self.report_every == 0:
+            self.export()
+
+    def summary(self):
+        """Flat dict of totals, per-step means and throughput"""
+        steps = max(self.steps, 1)
+        wall = (self._last_end - self._first_start) if self.steps else 0.0
+        result = {
+            "steps": self.steps,
+            "step_time_s": self.step_time,
+            "mean_step_us": self.step_time / steps * 1e6,
+            # Throughput of step() itself, and of the whole loop around it
+            "steps_per_sec": self.steps / self.step_time if self.step_time else 0.0,
+            "loop_steps_per_sec": self.steps / wall if wall else 0.0,
+        }
+        for phase, total in self.phase_time.items():
+            result[f"{phase}_us_per_step"] = total / steps * 1e6
+            result[f"{phase}_share"] = total / self.step_time if self.step_time else 0.0
+        for name, value in self.counters.items():
+            result[f"{name}_per_step"] = value / steps
+        if self.track_allocations:
+            result["alloc_bytes_per_step"] = self.alloc_bytes / steps
+            result["net_blocks_per_step"] = self.net_blocks / steps
+        return result
+
+    def export(self):
+        record = self.summary()
+        for exporter in self.exporters:
+            exporter(record)
+        return record
+
+
+class CsvExporter:
+    """Appends each summary as a CSV row; the header comes from the first one"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fields = None
+
+    def __call__(self, record):
+        with open(self.path, "a", newline="") as f:
+            if self._fields is None:
+                self._fields = list(record)
+                writer = csv.DictWriter(f, self._fields, extrasaction="ignore")
+                writer.writeheader()
+            else:
+                writer = csv.DictWriter(f, self._fields, extrasaction="ignore")
+            writer.writerow(record)
+
+
+class JsonLinesExporter:
+    """Appends each summary as one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
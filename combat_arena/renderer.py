@@ -0,0 +1,83 @@
+import numpy as np
+
+from .constants import INITIAL_HEALTH
+
+CELL_SIZE = 16
+
+# RGB per cell code, shifted by one so FOG (-1) is row 0. Unit cells are drawn
+# as empty floor here; the units themselves go on top as discs.
+PALETTE = np.array([
+    (128, 128, 128),  # FOG
+    (255, 255, 255),  # EMPTY
+    (0, 0, 0),        # WALL
+    (255, 215, 0),    # CAPTURE_NEUTRAL
+    (150, 170, 255),  # CAPTURE_P1
+    (255, 150, 150),  # CAPTURE_P2
+    (255, 255, 255),  # PLAYER1
+    (255, 255, 255),  # PLAYER2
+], dtype=np.uint8)
+TEAM_COLORS = np.array([(0, 0, 255), (255, 0, 0)], dtype=np.uint8)
+GRID_LINE_COLOR = np.array((60, 60, 60), dtype=np.uint8)
+HEALTH_COLOR = np.array((0, 200, 0), dtype=np.uint8)
+DAMAGE_COLOR = np.array((120, 0, 0), dtype=np.uint8)
+
+
+class RasterRenderer:
+    """
+    Draws arena frames straight into an RGB NumPy array.
+
+    The grid is coloured with one palette lookup and upscaled to cell_size
+    pixels per cell; each living unit is a disc in its team colour whose
+    radius shrinks with health, with a health bar along the top of its cell.
+    """
+
+    def __init__(self, grid_size, cell_size=CELL_SIZE, initial_health=INITIAL_HEALTH):
+        self.grid_size = grid_size
+        self.cell_size = cell_size
+        self.initial_health = initial_health
+        centre = (cell_size - 1) / 2
+        offsets = np.arange(cell_size) - centre
+        self._distance_sq = offsets[:, None] ** 2 + offsets[None, :] ** 2
+        self._columns = np.arange(cell_size)
+        self._bar_height = max(1, cell_size // 8)
+
+    def render(self, grid, positions, health, out=None):
+        """
+        Render grid (cell codes, FOG allowed) with the units in positions
+        ((2, units, 2) array) and health ((2, units) array). Returns a
+        (grid_size * cell_size, grid_size * cell_size, 3) uint8 image.
+        """
+        cs = self.cell_size
+        size = self.grid_size * cs
+        if out is None:
+            out = np.empty((size, size, 3), dtype=np.uint8)
+
+        # Palette lookup, then upscale every cell into a cs x cs block
+        colors = PALETTE[np.asarray(grid) + 1]
+        blocks = out.reshape(self.grid_size, cs, self.grid_size, cs, 3)
+        blocks[:] = colors[:, None, :, None, :]
+        out[::cs, :] = GRID_LINE_COLOR
+        out[:, ::cs] = GRID_LINE_COLOR
+
+        positions = np.asarray(positions).reshape(-1, 2)
+        health = np.asarray(health).reshape(-1)
+        teams = np.repeat(np.arange(2), len(health) // 2)
+        alive = health > 0
+        if not alive.any():
+            return out
+        positions, health, teams = positions[alive], health[alive], teams[alive]
+        ratio = np.clip(health / self.initial_health, 0, 1)
+
+        # Discs: one (units, cs, cs) mask, scattered into the image in one assignment
+        radius = 0.4 * cs * ratio
+        discs = self._distance_sq[None] <= (radius ** 2)[:, None, None]
+        unit, i, j = np.nonzero(discs)
+        out[positions[unit, 0] * cs + i, positions[unit, 1] * cs + j] = TEAM_COLORS[teams[unit]]
+
+        # Health bars across the top rows of each unit's cell
+        filled = self._columns[None, :] < np.ceil(ratio * cs)[:, None]
+        rows = positions[:, 0, None, None] * cs + 1 + np.arange(self._bar_height)[None, :, None]
+        cols = positions[:, 1, None, None] * cs + self._columns[None, None, :]
+        bar = np.where(filled[:, None, :, None], HEALTH_COLOR, DAMAGE_COLOR)
+        out[rows, cols] = np.broadcast_to(bar, rows.shape[:1] + (self._bar_height, cs, 3))
+        return out
@@ -0,0 +1,317 @@
+import json
+import struct
+import zlib
+from collections.abc import Sequence
+
+import numpy as np
+
+from .constants import CAPTURE_P1, CAPTURE_P2, PLAYER1, PLAYER2, DEFEND
+from .units import unit_ids
+
+MAGIC = b"CARPLAY1"
+# Footer: file offset and length of the compressed JSON index, then MAGIC again
+FOOTER = struct.Struct("<QQ8s")
+CHUNK_HEADER = struct.Struct("<Q")
+EPISODE_HEADER = struct.Struct("<IIIHH")  # turns, unit deltas, capture events, grid size, units
+
+UNIT_DELTA = np.dtype([("turn", "<u4"), ("unit", "<u2"), ("x", "<i2"), ("y", "<i2"), ("health", "<i2")])
+CAPTURE_EVENT = np.dtype([("turn", "<u4"), ("cell", "<u4"), ("owner", "i1")])
+
+
+def _encode_actions(env, actions):
+    """(2, units) int8 action codes from the (actions_p1, actions_p2) pair given to env.step"""
+    codes = np.full((2, env.units.num_units), DEFEND, dtype=np.int8)
+    for team in range(2):
+        for slot, action in env._unit_actions(team, actions[team]):
+            codes[team, slot] = action
+    return codes
+
+
+class ReplayWriter:
+    """
+    Streams episodes to one file in a compact, compressed format.
+
+    Each episode stores its starting terrain and units once, then per turn
+    the actions taken, the units whose position or health changed and any
+    capture points that changed owner. Finished episodes are buffered and
+    written chunk_episodes at a time as one zlib block, so memory stays
+    bounded by a chunk; close() appends the index used for random access.
+
+    Usage per episode: begin_episode(env) after reset, record_step(env,
+    actions) after every step, end_episode() when done.
+    """
+
+    def __init__(self, path, chunk_episodes=64, level=6):
+        self.path = path
+        self.chunk_episodes = chunk_episodes
+        self.level = level
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._chunks = []
+        self._episodes = []
+        self._pending = []
+        self._pending_entries = []
+        self._episode = None
+
+    def begin_episode(self, env, **metadata):
+        """Snapshot the env right after reset; metadata is stored in the index as JSON"""
+        if self._episode is not None:
+            raise RuntimeError("end_episode() must be called before starting another episode")
+        self._episode = {
+            "metadata": metadata,
+            "grid_size": env.grid_size,
+            "num_units": env.units.num_units,
+            "terrain": env.terrain.astype(np.int8),
+            "positions": env.units.positions.astype(np.int16),
+            "health": env.units.health.astype(np.int16),
+            "actions": [],
+            "unit_deltas": [],
+            "capture_events": [],
+        }
+        self._last_positions = env.units.positions.reshape(-1, 2).copy()
+        self._last_health = env.units.health.reshape(-1).copy()
+        self._last_terrain = env.terrain.copy()
+
+    def record_step(self, env, actions):
+        """Record the turn env.step(actions) just played"""
+        episode = self._episode
+        turn = len(episode["actions"]) + 1
+        episode["actions"].append(_encode_actions(env, actions))
+
+        positions = env.units.positions.reshape(-1, 2)
+        health = env.units.health.reshape(-1)
+        moved = (positions != self._last_positions).any(axis=1)
+        changed = np.flatnonzero(moved | (health != self._last_health))
+        if changed.size:
+            deltas = np.empty(changed.size, dtype=UNIT_DELTA)
+            deltas["turn"] = turn
+            deltas["unit"] = changed
+            deltas["x"] = positions[changed, 0]
+            deltas["y"] = positions[changed, 1]
+            deltas["health"] = health[changed]
+            episode["unit_deltas"].append(deltas)
+
+        # Ownership can only change under a unit that just moved
+        cells = positions[moved]
+        if len(cells):
+            owners = env.terrain[cells[:, 0], cells[:, 1]]
+            flipped = owners != self._last_terrain[cells[:, 0], cells[:, 1]]
+            if flipped.any():
+                cells, owners = cells[flipped], owners[flipped]
+                events = np.empty(len(cells), dtype=CAPTURE_EVENT)
+                events["turn"] = turn
+                events["cell"] = cells[:, 0] * env.grid_size + cells[:, 1]
+                events["owner"] = owners
+                episode["capture_events"].append(events)
+                self._last_terrain[cells[:, 0], cells[:, 1]] = owners
+
+        self._last_positions[:] = positions
+        self._last_health[:] = health
+
+    def end_episode(self):
+        episode, self._episode = self._episode, None
+        num_units = episode["num_units"]
+        actions = np.array(episode["actions"], dtype=np.int8).reshape(-1, 2, num_units)
+        deltas = np.concatenate(episode["unit_deltas"] or [np.empty(0, UNIT_DELTA)])
+        events = np.concatenate(episode["capture_events"] or [np.empty(0, CAPTURE_EVENT)])
+        payload = b"".join([
+            EPISODE_HEADER.pack(len(actions), len(deltas), len(events), episode["grid_size"], num_units),
+            episode["terrain"].tobytes(),
+            episode["positions"].tobytes(),
+            episode["health"].tobytes(),
+            actions.tobytes(),
+            deltas.tobytes(),
+            events.tobytes(),
+        ])
+        offset = sum(len(data) for data in self._pending)
+        self._pending.append(payload)
+        self._pending_entries.append({
+            "offset": offset,
+            "length": len(payload),
+            "turns": len(actions),
+            "metadata": episode["metadata"],
+        })
+        if len(self._pending) >= self.chunk_episodes:
+            self._flush_chunk()
+
+    def _flush_chunk(self):
+        if not self._pending:
+            return
+        block = zlib.compress(b"".join(self._pending), self.level)
+        file_offset = self._file.tell()
+        self._file.write(CHUNK_HEADER.pack(len(block)))
+        self._file.write(block)
+        chunk_id = len(self._chunks)
+        self._chunks.append([file_offset + CHUNK_HEADER.size, len(block)])
+        for entry in self._pending_entries:
+            entry["chunk"] = chunk_id
+            self._episodes.append(entry)
+        self._pending, self._pending_entries = [], []
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._episode is not None:
+            self.end_episode()
+        self._flush_chunk()
+        index = zlib.compress(json.dumps({"chunks": self._chunks, "episodes": self._episodes}).encode())
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(index_offset, len(index), MAGIC))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayEpisode(Sequence):
+    """
+    One decoded episode. Frames are rebuilt on demand by replaying the
+    stored deltas up to the requested turn, so len() is turns + 1 and
+    episode[t] is the GameVisualizer-style frame dict after turn t.
+    """
+
+    def __init__(self, payload, metadata=None):
+        turns, num_deltas, num_events, grid_size, num_units = EPISODE_HEADER.unpack_from(payload)
+        self.metadata = metadata or {}
+        self.grid_size = grid_size
+        self.num_units = num_units
+        self.turns = turns
+        offset = EPISODE_HEADER.size
+
+        def take(dtype, count, shape=None):
+            nonlocal offset
+            array = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array if shape is None else array.reshape(shape)
+
+        self.terrain = take(np.int8, grid_size * grid_size, (grid_size, grid_size))
+        self.initial_positions = take(np.int16, 2 * num_units * 2, (2, num_units, 2))
+        self.initial_health = take(np.int16, 2 * num_units, (2, num_units))
+        self.actions = take(np.int8, turns * 2 * num_units, (turns, 2, num_units))
+        self.unit_deltas = take(UNIT_DELTA, num_deltas)
+        self.capture_events = take(CAPTURE_EVENT, num_events)
+
+    def __len__(self):
+        return self.turns + 1
+
+    def state(self, turn):
+        """(terrain, positions, health) after the given turn, as fresh arrays"""
+        if not 0 <= turn <= self.turns:
+            raise IndexError(turn)
+        positions = self.initial_positions.reshape(-1, 2).astype(np.int64)
+        health = self.initial_health.reshape(-1).astype(np.int64)
+        deltas = self.unit_deltas[:np.searchsorted(self.unit_deltas["turn"], turn, side="right")]
+        # Keep only each unit's latest delta
+        _, last = np.unique(deltas["unit"][::-1], return_index=True)
+        deltas = deltas[len(deltas) - 1 - last]
+        positions[deltas["unit"], 0] = deltas["x"]
+        positions[deltas["unit"], 1] = deltas["y"]
+        health[deltas["unit"]] = deltas["health"]
+
+        terrain = self.terrain.astype(np.int64)
+        events = self.capture_events[:np.searchsorted(self.capture_events["turn"], turn, side="right")]
+        terrain.reshape(-1)[events["cell"]] = events["owner"]
+        return terrain, positions.reshape(2, self.num_units, 2), health.reshape(2, self.num_units)
+
+    def capture_points(self, turn):
+        """Captures made by each player up to the given turn"""
+        events = self.capture_events[:np.searchsorted(self.capture_events["turn"], turn, side="right")]
+        return [int(np.count_nonzero(events["owner"] == owner)) for owner in (CAPTURE_P1, CAPTURE_P2)]
+
+    def __getitem__(self, turn):
+        if turn < 0:
+            turn += len(self)
+        terrain, positions, health = self.state(turn)
+        grid = terrain.copy()
+        for team, marker in enumerate((PLAYER1, PLAYER2)):
+            living = positions[team][health[team] > 0]
+            grid[living[:, 0], living[:, 1]] = marker
+        p1_points, p2_points = self.capture_points(turn)
+        p1_ids, p2_ids = (unit_ids(team, len(health[team])) for team in range(2))
+        return {
+            'grid': grid,
+            'turn': turn,
+            'player1_units': [
+                {'position': (int(x), int(y)), 'health': int(h), 'id': p1_ids[i]}
+                for i, ((x, y), h) in enumerate(zip(positions[0], health[0]))
+            ],
+            'player2_units': [
+                {'position': (int(x), int(y)), 'health': int(h), 'id': p2_ids[i]}
+                for i, ((x, y), h) in enumerate(zip(positions[1], health[1]))
+            ],
+            'p1_capture_points': p1_points,
+            'p2_capture_points': p2_points
+        }
+
+
+class ReplayReader:
+    """
+    Random access to the episodes in a ReplayWriter file. Only the index is
+    read up front; an episode's chunk is decompressed when first asked for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            index = self._read_index()
+        except ValueError:
+            self._file.close()
+            raise
+        self._chunks = index["chunks"]
+        self._episodes = index["episodes"]
+        self._cached_chunk = (None, None)
+
+    def _read_index(self):
+        if self._file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not a replay file")
+        size = self._file.seek(0, 2)
+        magic = None
+        if size >= len(MAGIC) + FOOTER.size:
+            self._file.seek(-FOOTER.size, 2)
+            index_offset, index_length, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} has no index; was the writer closed?")
+        self._file.seek(index_offset)
+        return json.loads(zlib.decompress(self._file.read(index_length)))
+
+    def __len__(self):
+        return len(self._episodes)
+
+    def metadata(self, episode):
+        return self._episodes[episode]["metadata"]
+
+    def turns(self, episode):
+        return self._episodes[episode]["turns"]
+
+    def _chunk(self, chunk_id):
+        cached_id, data = self._cached_chunk
+        if cached_id != chunk_id:
+            offset, length = self._chunks[chunk_id]
+            self._file.seek(offset)
+            data = zlib.decompress(self._file.read(length))
+            self._cached_chunk = (chunk_id, data)
+        return data
+
+    def episode(self, episode):
+        entry = self._episodes[episode]
+        data = self._chunk(entry["chunk"])
+        payload = data[entry["offset"]:entry["offset"] + entry["length"]]
+        return ReplayEpisode(payload, entry["metadata"])
+
+    def frame(self, episode, turn):
+        return self.episode(episode)[turn]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,445 @@
+"""
+Asyncio rollout service: hosts pools of CombatArenaEnv arenas for remote learners.
+
+    python -m combat_arena.rollout_server --socket /tmp/arena.sock      # serve on a Unix socket
+    python -m combat_arena.rollout_server --port 5555                   # or on localhost TCP
+
+Every message is a HEADER (kind, request id, payload length) followed by the
+payload. A client OPENs a pool of arenas with a JSON config, then sends
+RESET and STEP requests; STEP carries an (arenas, 2, units) int8 array of
+action codes. Both answer with one batch: fixed-layout arrays (see
+batch_layout) packed back to back, so decoding is a few np.frombuffer calls.
+Arenas that finish are reset at once; their dones flag is set and the
+returned observation is the first one of the next episode.
+
+Each client's pool runs in a worker process of its own (PoolProcess), so
+pools of different clients step on different cores. Each connection is a
+pipeline of three tasks: reading requests, stepping its pool, and writing
+responses. Requests and responses wait in queues of max_pending entries. When a client sends faster than its
+arenas step, reads stop and socket flow control pushes back. When it reads
+too slowly, stepping stops behind a full response queue.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .constants import GRID_SIZE, MAX_TURNS, MAX_UNITS
+from .env import CombatArenaEnv
+
+HEADER = struct.Struct("<BII")  # kind, request id, payload length
+SEED = struct.Struct("<q")
+NO_SEED = -1
+
+OPEN = 1
+RESET = 2
+STEP = 3
+CLOSE = 4
+ERROR = 5
+
+MAX_PENDING = 4
+MAX_ARENAS_PER_CLIENT = 4096
+# Keys a client may set in its OPEN config, passed on to CombatArenaEnv
+ENV_OPTIONS = ("grid_size", "max_turns", "num_units", "rules", "wall_density", "capture_density")
+
+
+def batch_layout(num_arenas, grid_size, num_units):
+    """(name, dtype, shape) of every array in a RESET/STEP response, in wire order"""
+    return [
+        ("grid", np.int8, (num_arenas, 2, grid_size, grid_size)),
+        ("unit_positions", np.int16, (num_arenas, 2, num_units, 2)),
+        ("unit_health", np.int16, (num_arenas, 2, num_units)),
+        ("opponent_positions", np.int16, (num_arenas, 2, num_units, 2)),
+        ("opponent_health", np.int16, (num_arenas, 2, num_units)),
+        ("opponent_visible", np.bool_, (num_arenas, 2, num_units)),
+        ("capture_points", np.int16, (num_arenas, 2)),
+        ("turn", np.int32, (num_arenas,)),
+        ("rewards", np.int32, (num_arenas, 2)),
+        ("dones", np.bool_, (num_arenas,)),
+    ]
+
+
+def decode_batch(payload, layout):
+    """Read-only arrays over a response payload, keyed by name"""
+    arrays, offset = {}, 0
+    for name, dtype, shape in layout:
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(payload, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += arrays[name].nbytes
+    return arrays
+
+
+async def read_message(reader):
+    kind, request_id, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    payload = await reader.readexactly(length) if length else b""
+    return kind, request_id, payload
+
+
+def write_message(writer, kind, request_id, payload=b""):
+    writer.write(HEADER.pack(kind, request_id, len(payload)) + payload)
+
+
+class ArenaPool:
+    """
+    One client's arenas, stepped together into preallocated batch arrays.
+    With a seed, arena i is seeded with seed + i.
+    """
+
+    def __init__(self, num_arenas, seed=None, grid_size=GRID_SIZE, max_turns=MAX_TURNS, num_units=MAX_UNITS,
+                 **env_options):
+        self.num_arenas = num_arenas
+        self.grid_size = grid_size
+        self.num_units = num_units
+        self.envs = [
+            CombatArenaEnv(grid_size, max_turns, reuse_buffers=True, num_units=num_units,
+                           seed=None if seed is None else seed + i, **env_options)
+            for i in range(num_arenas)
+        ]
+        self.layout = batch_layout(num_arenas, grid_size, num_units)
+        self.arrays = {name: np.zeros(shape, dtype=dtype) for name, dtype, shape in self.layout}
+
+    def spec(self):
+        return {
+            "num_arenas": self.num_arenas,
+            "grid_size": self.grid_size,
+            "num_units": self.num_units,
+            "layout": [[name, np.dtype(dtype).str, list(shape)] for name, dtype, shape in self.layout],
+        }
+
+    def _write(self, i, observations):
+        arrays = self.arrays
+        for team, observation in enumerate(observations):
+            arrays["grid"][i, team] = observation["grid"]
+            arrays["unit_positions"][i, team] = observation["unit_positions"]
+            arrays["unit_health"][i, team] = observation["unit_health"]
+            arrays["opponent_positions"][i, team] = observation["opponent_positions"]
+            arrays["opponent_health"][i, team] = observation["opponent_health"]
+            arrays["opponent_visible"][i, team] = observation["opponent_visible"]
+            arrays["capture_points"][i, team] = observation["capture_points"]
+        arrays["turn"][i] = observations[0]["turn"]
+
+    def _pack(self):
+        return b"".join(self.arrays[name].tobytes() for name, _, _ in self.layout)
+
+    def reset(self, seed=None):
+        self.arrays["rewards"][:] = 0
+        self.arrays["dones"][:] = False
+        for i, env in enumerate(self.envs):
+            self._write(i, env.reset(seed=None if seed is None else seed + i))
+        return self._pack()
+
+    def step(self, actions):
+        """actions: (num_arenas, 2, num_units) action codes. Returns the packed batch."""
+        actions = actions.tolist()
+        for i, env in enumerate(self.envs):
+            obs_1, obs_2, rewards, done, _ = env.step(actions[i])
+            if done:
+                obs_1, obs_2 = env.reset()
+            self.arrays["rewards"][i] = rewards
+            self.arrays["dones"][i] = done
+            self._write(i, (obs_1, obs_2))
+        return self._pack()
+
+
+def _pool_worker(conn, num_arenas, seed, config):
+    """Run one ArenaPool, answering (method, argument) messages with (error, result) pairs"""
+    try:
+        pool = ArenaPool(num_arenas, seed=seed, **config)
+    except Exception as error:
+        conn.send((error, None))
+        conn.close()
+        return
+    conn.send((None, pool.spec()))
+    try:
+        while True:
+            method, argument = conn.recv()
+            if method == "close":
+                return
+            try:
+                conn.send((None, getattr(pool, method)(argument)))
+            except Exception as error:
+                conn.send((error, None))
+    except EOFError:
+        pass  # The server went away
+    finally:
+        conn.close()
+
+
+class PoolProcess:
+    """
+    An ArenaPool in a worker process of its own, with the same spec, reset
+    and step methods. Batches come back over a pipe; waiting on it releases
+    the GIL, so pools stepped from different threads use different cores.
+    Errors raised in the worker, including by the pool's constructor, are
+    raised again here.
+    """
+
+    def __init__(self, num_arenas, seed=None, start_method="spawn", **config):
+        context = mp.get_context(start_method)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_pool_worker, args=(child_conn, num_arenas, seed, config), daemon=True)
+        self._process.start()
+        child_conn.close()
+        try:
+            self._spec = self._receive()
+        except Exception:
+            self.close()
+            raise
+        self.num_arenas = self._spec["num_arenas"]
+        self.num_units = self._spec["num_units"]
+
+    def _receive(self):
+        error, result = self._conn.recv()
+        if error is not None:
+            raise error
+        return result
+
+    def _call(self, method, argument=None):
+        self._conn.send((method, argument))
+        return self._receive()
+
+    def spec(self):
+        return self._spec
+
+    def reset(self, seed=None):
+        return self._call("reset", seed)
+
+    def step(self, actions):
+        return self._call("step", actions)
+
+    def close(self):
+        try:
+            self._conn.send(("close", None))
+        except (BrokenPipeError, OSError):
+            pass  # The worker already exited
+        self._process.join()
+        self._conn.close()
+
+
+class RolloutServer:
+    """
+    Serves ArenaPools over a Unix socket (path) or localhost TCP (port).
+    Every client's pool runs in its own PoolProcess. A shared pool of
+    `workers` threads waits on them, so up to `workers` pools step at once,
+    each on its own core, while the event loop keeps serving I/O.
+    """
+
+    def __init__(self, path=None, host="127.0.0.1", port=None, workers=4, max_pending=MAX_PENDING,
+                 max_arenas_per_client=MAX_ARENAS_PER_CLIENT, start_method="spawn"):
+        if (path is None) == (port is None):
+            raise ValueError("Give exactly one of path or port")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.max_arenas_per_client = max_arenas_per_client
+        # spawn, as forking a process that runs an event loop and threads is unsafe
+        self.start_method = start_method
+        self.executor = ThreadPoolExecutor(workers)
+        self._server = None
+
+    async def start(self):
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _handle(self, reader, writer):
+        requests = asyncio.Queue(self.max_pending)
+        responses = asyncio.Queue(self.max_pending)
+
+        async def read_requests():
+            try:
+                while True:
+                    message = await read_message(reader)
+                    await requests.put(message)
+                    if message[0] == CLOSE:
+                        return
+            except (asyncio.IncompleteReadError, ConnectionError):
+                await requests.put((CLOSE, 0, b""))
+
+        async def write_responses():
+            while True:
+                message = await responses.get()
+                if message is None:
+                    return
+                try:
+                    write_message(writer, *message)
+                    await writer.drain()
+                except ConnectionError:
+                    pass  # Client went away; keep draining so the session can finish
+
+        reading = asyncio.ensure_future(read_requests())
+        writing = asyncio.ensure_future(write_responses())
+        loop = asyncio.get_running_loop()
+        pool = None
+        try:
+            while True:
+                kind, request_id, payload = await requests.get()
+                if kind == CLOSE:
+                    # The pool's process is gone by the time the client sees the reply
+                    if pool is not None:
+                        old_pool, pool = pool, None
+                        await loop.run_in_executor(self.executor, old_pool.close)
+                    await responses.put((CLOSE, request_id, b""))
+                    break
+                try:
+                    if kind == OPEN:
+                        if pool is not None:
+                            old_pool, pool = pool, None
+                            await loop.run_in_executor(self.executor, old_pool.close)
+                        pool = await loop.run_in_executor(self.executor, self._open, payload)
+                        result = json.dumps(pool.spec()).encode()
+                    elif pool is None:
+                        raise RuntimeError("OPEN a pool first")
+                    elif kind == RESET:
+                        (seed,) = SEED.unpack(payload) if payload else (NO_SEED,)
+                        result = await loop.run_in_executor(
+                            self.executor, pool.reset, None if seed == NO_SEED else seed
+                        )
+                    elif kind == STEP:
+                        shape = (pool.num_arenas, 2, pool.num_units)
+                        if len(payload) != int(np.prod(shape)):
+                            raise ValueError(f"STEP expects {shape} int8 actions, got {len(payload)} bytes")
+                        actions = np.frombuffer(payload, dtype=np.int8).reshape(shape)
+                        result = await loop.run_in_executor(self.executor, pool.step, actions)
+                    else:
+                        raise ValueError(f"Unknown message kind {kind}")
+                    await responses.put((kind, request_id, result))
+                except Exception as error:
+                    await responses.put((ERROR, request_id, f"{type(error).__name__}: {error}".encode()))
+        finally:
+            await responses.put(None)
+            await writing
+            reading.cancel()
+            writer.close()
+            if pool is not None:
+                await loop.run_in_executor(self.executor, pool.close)
+
+    def _open(self, payload):
+        config = json.loads(payload)
+        num_arenas = int(config.pop("num_arenas"))
+        seed = config.pop("seed", None)
+        unknown = set(config) - set(ENV_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown options {sorted(unknown)}")
+        if not 0 < num_arenas <= self.max_arenas_per_client:
+            raise ValueError(f"num_arenas must be between 1 and {self.max_arenas_per_client}")
+        return PoolProcess(num_arenas, seed=seed, start_method=self.start_method, **config)
+
+
+class RolloutClient:
+    """
+    Stand-in asyncio client. submit_step() sends a step without waiting for
+    the answer, so up to max_in_flight steps can be pipelined; step() is the
+    send-and-wait shorthand.
+    """
+
+    def __init__(self, reader, writer, max_in_flight=MAX_PENDING):
+        self._reader = reader
+        self._writer = writer
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._futures = {}
+        self._next_id = 0
+        self._receiving = asyncio.ensure_future(self._receive())
+        self.spec = None
+        self.layout = None
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None, max_in_flight=MAX_PENDING):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, max_in_flight)
+
+    async def _receive(self):
+        try:
+            while True:
+                kind, request_id, payload = await read_message(self._reader)
+                future = self._futures.pop(request_id)
+                self._in_flight.release()
+                if kind == ERROR:
+                    future.set_exception(RuntimeError(payload.decode()))
+                else:
+                    future.set_result(payload)
+        except (asyncio.IncompleteReadError, ConnectionError) as error:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Server connection lost: {error}"))
+
+    async def _send(self, kind, payload=b""):
+        """Send a request and return a future for its response payload"""
+        await self._in_flight.acquire()
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = future
+        write_message(self._writer, kind, request_id, payload)
+        await self._writer.drain()
+        return future
+
+    async def open(self, num_arenas, seed=None, **env_options):
+        payload = json.dumps(dict(env_options, num_arenas=num_arenas, seed=seed)).encode()
+        self.spec = json.loads(await (await self._send(OPEN, payload)))
+        self.layout = [(name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in self.spec["layout"]]
+        return self.spec
+
+    def _split(self, payload):
+        arrays = decode_batch(payload, self.layout)
+        return arrays, arrays.pop("rewards"), arrays.pop("dones")
+
+    async def reset(self, seed=None):
+        payload = await (await self._send(RESET, SEED.pack(NO_SEED if seed is None else seed)))
+        return self._split(payload)[0]
+
+    async def submit_step(self, actions):
+        """Send (num_arenas, 2, num_units) action codes; await the result for (observations, rewards, dones)"""
+        future = await self._send(STEP, np.ascontiguousarray(actions, dtype=np.int8).tobytes())
+
+        async def result():
+            return self._split(await future)
+        return asyncio.ensure_future(result())
+
+    async def step(self, actions):
+        return await (await self.submit_step(actions))
+
+    async def close(self):
+        try:
+            await (await self._send(CLOSE))
+        finally:
+            self._receiving.cancel()
+            self._writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve CombatArenaEnv pools to remote learners")
+    parser.add_argument("--socket", help="Unix socket path to listen on")
+    parser.add_argument("--port", type=int, help="localhost TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=4, help="arena pools stepped at once")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING, help="queued requests per client")
+    args = parser.parse_args()
+    server = RolloutServer(args.socket, port=args.port, workers=args.workers, max_pending=args.max_pending)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Scenario banks: fixed maps for curricula, tournaments and hand-made setups.
+
+A scenario file is JSON. Every map in it shares one grid size and unit count:
+
+    {
+      "grid_size": 7,
+      "num_units": 2,
+      "scenarios": [
+        {"name": "corridor", "stage": 0, "map": [
+          "#######",
+          "A.....B",
+          "A..+..B",
+          "#######",
+          "#######",
+          "#######",
+          "#######"
+        ]},
+        {"name": "open", "stage": 1, "generate": {"seed": 0, "count": 100, "wall_density": 0.1}}
+      ]
+    }
+
+Map rows use MAP_CHARS; A and B are player 1 and player 2 spawns, given to
+unit slots row by row. A "generate" entry expands into count maps from
+mapgen.generate_map seeded seed, seed + 1, ..., named name-0, name-1, ...
+
+compile_scenarios parses and checks the file once and saves the maps,
+spawns and stages as .npy arrays in a bank directory. ScenarioBank opens
+those with mmap_mode="r", so every process using a bank shares the same
+read-only pages, and resetting an env to a scenario copies one row.
+
+    python -m combat_arena.scenarios scenarios.json bank_dir
+"""
+import argparse
+import copy
+import json
+import os
+
+import numpy as np
+
+from .constants import (
+    EMPTY, WALL, CAPTURE_NEUTRAL, CAPTURE_P1, CAPTURE_P2, MAX_UNITS, WALL_DENSITY, CAPTURE_DENSITY
+)
+from .mapgen import generate_map, spawns_connected
+
+MAP_CHARS = {".": EMPTY, "#": WALL, "+": CAPTURE_NEUTRAL, "1": CAPTURE_P1, "2": CAPTURE_P2, "A": EMPTY, "B": EMPTY}
+SPAWN_CHARS = ("A", "B")
+INDEX_FILE = "index.json"
+BANK_VERSION = 1
+
+
+def parse_map(rows, grid_size, num_units):
+    """int8 terrain and (2, num_units, 2) int16 spawns of a map given as rows of MAP_CHARS"""
+    if len(rows) != grid_size or any(len(row) != grid_size for row in rows):
+        raise ValueError(f"map must be {grid_size} rows of {grid_size} cells")
+    cells = np.array([list(row) for row in rows])
+    unknown = {str(char) for char in np.unique(cells)} - set(MAP_CHARS)
+    if unknown:
+        raise ValueError(f"unknown map cells {sorted(unknown)}, expected any of {''.join(MAP_CHARS)!r}")
+
+    terrain = np.full((grid_size, grid_size), EMPTY, dtype=np.int8)
+    for char, code in MAP_CHARS.items():
+        terrain[cells == char] = code
+    spawns = np.empty((2, num_units, 2), dtype=np.int16)
+    for team, char in enumerate(SPAWN_CHARS):
+        team_spawns = np.argwhere(cells == char)
+        if len(team_spawns) != num_units:
+            raise ValueError(f"map has {len(team_spawns)} {char} spawns, expected {num_units}")
+        spawns[team] = team_spawns
+    if not spawns_connected(terrain, spawns):
+        raise ValueError("not every spawn can reach the others")
+    return terrain, spawns
+
+
+def _expand(entry, grid_size, num_units):
+    """(name, terrain, spawns) for each map one scenario file entry stands for"""
+    name = entry["name"]
+    if "map" in entry:
+        try:
+            return [(name, *parse_map(entry["map"], grid_size, num_units))]
+        except ValueError as e:
+            raise ValueError(f"Scenario {name!r}: {e}") from None
+    if "generate" in entry:
+        options = entry["generate"]
+        seed = options.get("seed", 0)
+        count = options.get("count", 1)
+        wall_density = options.get("wall_density", WALL_DENSITY)
+        capture_density = options.get("capture_density", CAPTURE_DENSITY)
+        return [
+            (name if count == 1 else f"{name}-{k}",
+             *generate_map(np.random.default_rng(seed + k), grid_size, num_units, wall_density, capture_density))
+            for k in range(count)
+        ]
+    raise ValueError(f"Scenario {name!r} needs a map or a generate entry")
+
+
+def compile_scenarios(source, bank_dir):
+    """
+    Compile a scenario file, given as a path or as the parsed dict, into
+    bank_dir and return it opened as a ScenarioBank
+    """
+    if not isinstance(source, dict):
+        with open(source) as f:
+            source = json.load(f)
+    grid_size = source["grid_size"]
+    num_units = source.get("num_units", MAX_UNITS)
+
+    names, stages, terrain, spawns = [], [], [], []
+    for entry in source["scenarios"]:
+        for name, map_terrain, map_spawns in _expand(entry, grid_size, num_units):
+            names.append(name)
+            stages.append(entry.get("stage", 0))
+            terrain.append(map_terrain)
+            spawns.append(map_spawns)
+    if not names:
+        raise ValueError("The scenario file holds no scenarios")
+    if len(set(names)) != len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Duplicate scenario names {duplicates}")
+
+    os.makedirs(bank_dir, exist_ok=True)
+    np.save(os.path.join(bank_dir, "terrain.npy"), np.stack(terrain).astype(np.int8))
+    np.save(os.path.join(bank_dir, "spawns.npy"), np.stack(spawns).astype(np.int16))
+    np.save(os.path.join(bank_dir, "stages.npy"), np.array(stages, dtype=np.int32))
+    # The index goes last, so a bank whose arrays failed to save does not open
+    with open(os.path.join(bank_dir, INDEX_FILE), "w") as f:
+        json.dump({"version": BANK_VERSION, "grid_size": grid_size, "num_units": num_units, "names": names}, f)
+    return ScenarioBank(bank_dir)
+
+
+class ScenarioBank:
+    """
+    A compiled scenario directory, memory-mapped read-only. Scenario i is
+    (terrain[i], spawns[i]) and belongs to curriculum stage stages[i]; it can
+    also be looked up by name.
+
+    A bank works anywhere a mapgen.MapPool does: as an env's map_pool, resets
+    draw one of the scenarios in ids (all of them, or a subset chosen with
+    stage), and reset(scenario_id=...) picks one directly. Pickling a bank
+    sends only its path, so pool workers reopen the same shared file.
+    """
+
+    def __init__(self, path, ids=None):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index.get("version") != BANK_VERSION:
+            raise ValueError(f"{path} is a version {index.get('version')} bank, expected {BANK_VERSION}")
+        self.grid_size = index["grid_size"]
+        self.num_units = index["num_units"]
+        self.names = index["names"]
+        self._ids_by_name = {name: i for i, name in enumerate(self.names)}
+        # Plain ndarray views onto the maps; the memmaps stay open underneath
+        self.terrain = np.asarray(np.load(os.path.join(path, "terrain.npy"), mmap_mode="r"))
+        self.spawns = np.asarray(np.load(os.path.join(path, "spawns.npy"), mmap_mode="r"))
+        self.stages = np.asarray(np.load(os.path.join(path, "stages.npy"), mmap_mode="r"))
+        self.ids = np.arange(len(self.names)) if ids is None else np.asarray(ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, scenario_id):
+        if isinstance(scenario_id, str):
+            scenario_id = self.find(scenario_id)
+        return self.terrain[scenario_id], self.spawns[scenario_id]
+
+    def __getstate__(self):
+        return {"path": self.path, "ids": self.ids}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["ids"])
+
+    def find(self, name):
+        """Scenario id of a scenario name"""
+        try:
+            return self._ids_by_name[name]
+        except KeyError:
+            raise KeyError(f"No scenario named {name!r} in {self.path}") from None
+
+    def stage(self, *stages):
+        """A bank over the same arrays whose draws only pick scenarios from the given curriculum stages"""
+        ids = np.flatnonzero(np.isin(self.stages, stages))
+        if len(ids) == 0:
+            raise ValueError(f"No scenarios in stage(s) {stages}")
+        bank = copy.copy(self)
+        bank.ids = ids
+        return bank
+
+    def draw(self, rng):
+        """Pick a scenario from ids with one draw from rng"""
+        return self[int(self.ids[rng.integers(len(self.ids))])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a scenario file into a memory-mapped scenario bank")
+    parser.add_argument("scenarios", help="scenario JSON file")
+    parser.add_argument("bank_dir")
+    args = parser.parse_args()
+    bank = compile_scenarios(args.scenarios, args.bank_dir)
+    stages = ", ".join(f"{stage}: {count}" for stage, count in zip(*np.unique(bank.stages, return_counts=True)))
+    print(f"Compiled {len(bank)} scenario(s) of {bank.grid_size}x{bank.grid_size} for {bank.num_units} units "
+          f"per team to {args.bank_dir} (stages {stages})")
+
+
+if __name__ == "__main__":
+    main()
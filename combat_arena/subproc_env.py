@@ -0,0 +1,223 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .constants import GRID_SIZE, MAX_TURNS, MAX_UNITS, DEFEND
+from .env import CombatArenaEnv
+from .mapgen import check_map_pool
+from .encoding import observation_shapes, encode_observation
+
+
+def _buffer_layout(num_envs, grid_size, num_units):
+    """Shape and dtype of every shared array, keyed by name"""
+    layout = {}
+    for key, (shape, dtype) in observation_shapes(grid_size, num_units).items():
+        layout["obs_" + key] = ((num_envs, 2) + shape, dtype)
+        layout["final_" + key] = ((num_envs, 2) + shape, dtype)
+    layout["actions"] = ((num_envs, 2, num_units), np.int8)
+    layout["rewards"] = ((num_envs, 2), np.int32)
+    layout["dones"] = ((num_envs,), np.bool_)
+    return layout
+
+
+def _attach(layout, names):
+    """Map every shared block named in names to a NumPy array"""
+    handles, arrays = [], {}
+    for key, (shape, dtype) in layout.items():
+        shm = shared_memory.SharedMemory(name=names[key])
+        handles.append(shm)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return handles, arrays
+
+
+def _observation_views(arrays, prefix, env_id, team):
+    return {
+        key[len(prefix):]: array[env_id, team]
+        for key, array in arrays.items() if key.startswith(prefix)
+    }
+
+
+def _env_seed(seed, env_id):
+    return None if seed is None else seed + env_id
+
+
+def _worker(conn, env_ids, grid_size, max_turns, num_units, seed, layout, names, map_pool):
+    handles, arrays = _attach(layout, names)
+    envs = [
+        CombatArenaEnv(grid_size, max_turns, reuse_buffers=True, seed=_env_seed(seed, i), num_units=num_units,
+                       map_pool=map_pool)
+        for i in env_ids
+    ]
+    # Views into the shared buffers are built once; encoding writes straight into them
+    obs_views = [[_observation_views(arrays, "obs_", i, team) for team in range(2)] for i in env_ids]
+    final_views = [[_observation_views(arrays, "final_", i, team) for team in range(2)] for i in env_ids]
+    actions, rewards, dones = arrays["actions"], arrays["rewards"], arrays["dones"]
+
+    def write(views, observations):
+        for team in range(2):
+            encode_observation(observations[team], team, views[team])
+
+    try:
+        while True:
+            command, argument = conn.recv()
+            try:
+                if command == "step":
+                    for local, i in enumerate(env_ids):
+                        env = envs[local]
+                        obs_1, obs_2, reward, done, _ = env.step((actions[i, 0], actions[i, 1]))
+                        rewards[i] = reward
+                        dones[i] = done
+                        if done:
+                            write(final_views[local], (obs_1, obs_2))
+                            obs_1, obs_2 = env.reset()
+                        write(obs_views[local], (obs_1, obs_2))
+                elif command == "reset":
+                    seed, scenario_ids = argument
+                    for local, i in enumerate(env_ids):
+                        scenario_id = None if scenario_ids is None else scenario_ids[i]
+                        write(obs_views[local], envs[local].reset(seed=_env_seed(seed, i), scenario_id=scenario_id))
+                elif command == "close":
+                    break
+                conn.send(None)
+            except Exception:
+                conn.send(traceback.format_exc())
+    finally:
+        del actions, rewards, dones, arrays, obs_views, final_views
+        for shm in handles:
+            shm.close()
+        conn.close()
+
+
+class SubprocCombatArenaEnv:
+    """
+    Runs num_envs CombatArenaEnv instances across worker processes.
+
+    Workers write encoded observations (see encoding.py), rewards and done
+    flags into multiprocessing.shared_memory arrays shaped (num_envs, 2, ...),
+    with player 1 at index 0 and player 2 at index 1. Actions are written
+    the same way as an (num_envs, 2, num_units) int8 array of action codes,
+    so only a short command string crosses each pipe per step.
+
+    Returned arrays are views of the shared buffers and are overwritten by
+    the next reset or step_wait; copy them to keep them. With a seed, env i
+    is seeded with seed + i, as in BatchedCombatArenaEnv.
+
+    A map_pool is sent to every worker; a scenarios.ScenarioBank pickles as
+    its path, so all workers map the same read-only bank.
+    """
+
+    def __init__(self, num_envs, envs_per_worker=1, grid_size=GRID_SIZE, max_turns=MAX_TURNS, seed=None,
+                 start_method=None, num_units=MAX_UNITS, map_pool=None):
+        check_map_pool(map_pool, grid_size, num_units)
+        self.num_envs = num_envs
+        self.grid_size = grid_size
+        self.max_turns = max_turns
+        self.num_units = num_units
+        self.map_pool = map_pool
+        self.closed = False
+        self._waiting = False
+
+        layout = _buffer_layout(num_envs, grid_size, num_units)
+        self._handles = []
+        names = {}
+        for key, (shape, dtype) in layout.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._handles.append(shm)
+            names[key] = shm.name
+        self._arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            for (key, (shape, dtype)), shm in zip(layout.items(), self._handles)
+        }
+        self._arrays["actions"][:] = DEFEND
+        self.observations = {key[4:]: array for key, array in self._arrays.items() if key.startswith("obs_")}
+        self.final_observations = {key[6:]: array for key, array in self._arrays.items() if key.startswith("final_")}
+
+        context = mp.get_context(start_method)
+        self._conns, self._processes = [], []
+        for start in range(0, num_envs, envs_per_worker):
+            env_ids = list(range(start, min(start + envs_per_worker, num_envs)))
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child_conn, env_ids, grid_size, max_turns, num_units, seed, layout, names, map_pool),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    @property
+    def num_workers(self):
+        return len(self._processes)
+
+    def _broadcast(self, command, argument=None):
+        for conn in self._conns:
+            conn.send((command, argument))
+
+    def _gather(self):
+        errors = [error for error in (conn.recv() for conn in self._conns) if error is not None]
+        if errors:
+            raise RuntimeError("Worker failed:\n" + errors[0])
+
+    def reset(self, seed=None, scenario_ids=None):
+        """scenario_ids, if given, holds the map_pool map each env resets to, as in BatchedCombatArenaEnv"""
+        if scenario_ids is not None:
+            if self.map_pool is None:
+                raise ValueError("reset(scenario_ids=...) needs a map_pool, e.g. a scenarios.ScenarioBank")
+            if len(scenario_ids) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} scenario ids, got {len(scenario_ids)}")
+            scenario_ids = list(scenario_ids)
+        self._broadcast("reset", (seed, scenario_ids))
+        self._gather()
+        return self.observations
+
+    def step_async(self, actions):
+        """Hand an (num_envs, 2, num_units) array of action codes to the workers"""
+        self._arrays["actions"][:] = actions
+        self._broadcast("step")
+        self._waiting = True
+
+    def step_wait(self):
+        """
+        Wait for the step started by step_async. Returns observations, (N, 2)
+        rewards, an (N,) done mask and an info dict; finished envs have been
+        reset and their last observation is in info["final_observation"].
+        """
+        self._gather()
+        self._waiting = False
+        dones = self._arrays["dones"]
+        info = {"final_observation": self.final_observations} if dones.any() else {}
+        return self.observations, self._arrays["rewards"], dones, info
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        if self._waiting:
+            self._gather()
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+                conn.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join()
+        self.observations = self.final_observations = self._arrays = None
+        for shm in self._handles:
+            shm.close()
+            shm.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,164 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .constants import PLAYER_PREFIXES
+
+
+def unit_ids(team, num_units):
+    """String ids used by the dict-shaped API, e.g. "P1_U0" """
+    return [f"{PLAYER_PREFIXES[team]}_U{i}" for i in range(num_units)]
+
+
+class UnitStore:
+    """
+    Struct-of-arrays storage for both players' units.
+
+    Row 0 holds player 1 and row 1 player 2; units are addressed by integer
+    slot within a team. Positions are (x, y) pairs in a (2, num_units, 2) array.
+    """
+
+    def __init__(self, num_units, initial_health):
+        self.num_units = num_units
+        self.initial_health = initial_health
+        self.positions = np.zeros((2, num_units, 2), dtype=np.int32)
+        self.health = np.zeros((2, num_units), dtype=np.int32)
+        self.capture_points = np.zeros(2, dtype=np.int32)
+        self.ids = [unit_ids(team, num_units) for team in range(2)]
+        self._slots = [{unit_id: slot for slot, unit_id in enumerate(ids)} for ids in self.ids]
+
+    def reset(self, positions):
+        self.positions[:] = positions
+        self.health[:] = self.initial_health
+        self.capture_points[:] = 0
+
+    def copy(self):
+        """Independent store with the same unit state; ids are shared, they never change"""
+        store = UnitStore.__new__(UnitStore)
+        store.__dict__.update(self.__dict__)
+        store.positions = self.positions.copy()
+        store.health = self.health.copy()
+        store.capture_points = self.capture_points.copy()
+        return store
+
+    @property
+    def alive(self):
+        return self.health > 0
+
+    def slot_of(self, team, unit_id):
+        """Slot index of a unit id in the given team, or None if it is not one of its units"""
+        if isinstance(unit_id, (int, np.integer)):
+            return int(unit_id) if 0 <= unit_id < self.num_units else None
+        return self._slots[team].get(unit_id)
+
+
+class UnitView(Mapping):
+    """
+    Read-only dict-like view of one live unit row, with "position", "health"
+    and "id" keys. Writes are refused: the env keeps grid and occupant in step
+    with the unit arrays, so units are changed through the env (e.g. set_state).
+    """
+
+    _KEYS = ("position", "health", "id")
+
+    def __init__(self, positions, health, ids, index):
+        self._positions = positions
+        self._health = health
+        self._ids = ids
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == "position":
+            x, y = self._positions[self._index]
+            return (int(x), int(y))
+        if key == "health":
+            return int(self._health[self._index])
+        if key == "id":
+            return self._ids[self._index]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        raise TypeError("Unit views are read-only; change units through the env, e.g. with set_state")
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class UnitList(Sequence):
+    """
+    Lazy list of unit dicts over a snapshot of unit arrays, optionally
+    restricted to some indices. The dicts are built together on first access,
+    from one tolist() per array, and reused after that, so the arrays must not
+    change once the list has been read. The length needs no dicts.
+    """
+
+    def __init__(self, positions, health, ids, indices=None):
+        self._positions = positions
+        self._health = health
+        self._ids = ids
+        self._indices = indices
+        self._rows = None
+
+    def _unit_rows(self):
+        if self._rows is None:
+            positions = self._positions.tolist()
+            health = self._health.tolist()
+            indices = range(len(self._ids)) if self._indices is None else self._indices.tolist()
+            self._rows = [
+                {"position": tuple(positions[i]), "health": health[i], "id": self._ids[i]}
+                for i in indices
+            ]
+        return self._rows
+
+    def __getitem__(self, i):
+        return self._unit_rows()[i]
+
+    def __iter__(self):
+        return iter(self._unit_rows())
+
+    def __len__(self):
+        return len(self._ids) if self._indices is None else len(self._indices)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return self._unit_rows() == list(other)
+
+    def __repr__(self):
+        return repr(self._unit_rows())
+
+
+class PlayerView(Mapping):
+    """Read-only dict-like view of one team, with "units" and "capture_points" keys"""
+
+    _KEYS = ("units", "capture_points")
+
+    def __init__(self, store, team):
+        self._store = store
+        self._team = team
+        self._units = [
+            UnitView(store.positions[team], store.health[team], store.ids[team], slot)
+            for slot in range(store.num_units)
+        ]
+
+    def __getitem__(self, key):
+        if key == "units":
+            return self._units
+        if key == "capture_points":
+            return int(self._store.capture_points[self._team])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        raise TypeError("Player views are read-only; change the game through the env, e.g. with set_state")
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
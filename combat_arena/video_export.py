@@ -0,0 +1,195 @@
+"""
+Batch export of replay episodes to video.
+
+Frames are rendered to RGB arrays by RasterRenderer in a process pool, a
+chunk of frames per task, and streamed in order to an encoder: an ffmpeg
+subprocess fed raw frames through a pipe, or pillow when ffmpeg is missing
+or a GIF is asked for. At most max_in_flight chunks are pending at once,
+so memory stays bounded however many episodes are exported.
+
+    python -m combat_arena.video_export replays.bin out_dir --format mp4 --processes 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+from collections import deque
+
+import numpy as np
+
+from .constants import PLAYER1, PLAYER2, INITIAL_HEALTH
+from .renderer import (
+    RasterRenderer, CELL_SIZE, PALETTE, TEAM_COLORS, GRID_LINE_COLOR, HEALTH_COLOR, DAMAGE_COLOR
+)
+from .replay import ReplayReader
+
+CHUNK_FRAMES = 16
+FPS = 2
+
+# Every colour RasterRenderer draws, so GIF frames index a fixed palette exactly
+GIF_PALETTE = np.unique(
+    np.concatenate([PALETTE, TEAM_COLORS, GRID_LINE_COLOR[None], HEALTH_COLOR[None], DAMAGE_COLOR[None]]),
+    axis=0
+)
+_GIF_KEYS = (GIF_PALETTE.astype(np.int32) << np.array([16, 8, 0])).sum(axis=1)
+
+# Per-worker state, set up by _init_worker
+_reader = None
+_cell_size = CELL_SIZE
+_renderers = {}
+
+
+def _init_worker(replay_path, cell_size):
+    global _reader, _cell_size
+    _reader = ReplayReader(replay_path)
+    _cell_size = cell_size
+
+
+def _render_chunk(task):
+    """Render turns [start, stop) of an episode; GIF frames come back as palette indices"""
+    episode_id, start, stop, indexed = task
+    episode = _reader.episode(episode_id)
+    renderer = _renderers.get(episode.grid_size)
+    if renderer is None:
+        renderer = _renderers[episode.grid_size] = RasterRenderer(episode.grid_size, _cell_size, INITIAL_HEALTH)
+    size = episode.grid_size * _cell_size
+    rgb = np.empty((size, size, 3), dtype=np.uint8)
+    frames = np.empty((stop - start, size, size) if indexed else (stop - start, size, size, 3), dtype=np.uint8)
+    for i, turn in enumerate(range(start, stop)):
+        terrain, positions, health = episode.state(turn)
+        for team, marker in enumerate((PLAYER1, PLAYER2)):
+            living = positions[team][health[team] > 0]
+            terrain[living[:, 0], living[:, 1]] = marker
+        renderer.render(terrain, positions, health, out=rgb if indexed else frames[i])
+        if indexed:
+            keys = (rgb.astype(np.int32) << np.array([16, 8, 0], dtype=np.int32)).sum(axis=2)
+            frames[i] = np.searchsorted(_GIF_KEYS, keys)
+    return episode_id, frames
+
+
+class FFmpegEncoder:
+    """Pipes raw RGB frames into an ffmpeg process writing an H.264 video"""
+
+    def __init__(self, path, width, height, fps=FPS):
+        self.path = path
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg", "-loglevel", "error", "-y",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                # yuv420p needs even dimensions
+                "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", "-c:v", "libx264", path,
+            ],
+            stdin=subprocess.PIPE
+        )
+
+    def write(self, frames):
+        self._process.stdin.write(np.ascontiguousarray(frames).tobytes())
+
+    def close(self):
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed writing {self.path}")
+
+
+class PillowEncoder:
+    """
+    Writes a GIF with pillow from palette-index frames. Pillow needs every
+    frame before it writes, so one episode is held at one byte per pixel.
+    """
+
+    def __init__(self, path, width, height, fps=FPS):
+        self.path = path
+        self.fps = fps
+        self._frames = []
+
+    def write(self, frames):
+        from PIL import Image
+        for frame in frames:
+            image = Image.fromarray(frame, mode="P")
+            image.putpalette(GIF_PALETTE.tobytes())
+            self._frames.append(image)
+
+    def close(self):
+        first, *rest = self._frames
+        first.save(self.path, save_all=True, append_images=rest, duration=int(1000 / self.fps), loop=0)
+        self._frames = []
+
+
+def export_replays(replay_path, output_dir, episodes=None, fmt="mp4", fps=FPS, cell_size=CELL_SIZE,
+                   processes=None, chunk_frames=CHUNK_FRAMES, max_in_flight=None, start_method=None):
+    """
+    Export episodes (all by default) of a ReplayWriter file to
+    output_dir/episode_<index>.<fmt>. fmt is "mp4" (ffmpeg) or "gif"
+    (pillow); mp4 falls back to gif when ffmpeg is not installed.
+    Returns the written paths.
+    """
+    if fmt == "mp4" and shutil.which("ffmpeg") is None:
+        print("FFmpeg not found. Saving as GIF instead...")
+        fmt = "gif"
+    if fmt not in ("mp4", "gif"):
+        raise ValueError(f"Unknown format {fmt!r}, expected 'mp4' or 'gif'")
+    indexed = fmt == "gif"
+    encoder_type = PillowEncoder if indexed else FFmpegEncoder
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ReplayReader(replay_path) as reader:
+        if episodes is None:
+            episodes = range(len(reader))
+        # Only the sizes are needed here; the workers decode the episodes themselves
+        jobs = []
+        for episode_id in episodes:
+            grid_size = reader.episode(episode_id).grid_size
+            jobs.append((episode_id, reader.turns(episode_id) + 1, grid_size * cell_size))
+
+    def tasks():
+        for episode_id, num_frames, _ in jobs:
+            for start in range(0, num_frames, chunk_frames):
+                yield episode_id, start, min(start + chunk_frames, num_frames), indexed
+
+    context = mp.get_context(start_method)
+    processes = processes or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * processes
+    paths = []
+    with context.Pool(processes, _init_worker, (replay_path, cell_size)) as pool:
+        pending = deque()
+        task_iter = tasks()
+        for task in task_iter:
+            pending.append(pool.apply_async(_render_chunk, (task,)))
+            if len(pending) >= max_in_flight:
+                break
+
+        # Chunks come back in submission order, so episodes are encoded one after another
+        for episode_id, num_frames, size in jobs:
+            path = os.path.join(output_dir, f"episode_{episode_id:05d}.{fmt}")
+            encoder = encoder_type(path, size, size, fps)
+            written = 0
+            while written < num_frames:
+                _, frames = pending.popleft().get()
+                next_task = next(task_iter, None)
+                if next_task is not None:
+                    pending.append(pool.apply_async(_render_chunk, (next_task,)))
+                encoder.write(frames)
+                written += len(frames)
+            encoder.close()
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export replay episodes to video")
+    parser.add_argument("replay", help="file written by replay.ReplayWriter")
+    parser.add_argument("output_dir")
+    parser.add_argument("--episodes", type=int, nargs="+", help="episode indices (default: all)")
+    parser.add_argument("--format", choices=("mp4", "gif"), default="mp4")
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--cell-size", type=int, default=CELL_SIZE)
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+    paths = export_replays(args.replay, args.output_dir, args.episodes, args.format, args.fps, args.cell_size,
+                           args.processes)
+    print(f"Exported {len(paths)} episode(s) to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import numpy as np
+
+from .constants import FOG
+
+# Above this many viewers one dilation pass over the map beats stamping a square per unit
+STAMP_LIMIT = 32
+
+
+def dilate(mask, radius, out=None, scratch=None):
+    """
+    Grow a boolean mask over its last two axes by a square of the given radius.
+
+    Works on any leading batch dimensions. The result is written to out and
+    scratch holds the intermediate row pass; both are allocated if not given.
+    """
+    rows = mask.shape[-2]
+    cols = mask.shape[-1]
+    if scratch is None:
+        scratch = np.empty_like(mask)
+    if out is None:
+        out = np.empty_like(mask)
+
+    np.copyto(scratch, mask)
+    for shift in range(1, radius + 1):
+        scratch[..., shift:, :] |= mask[..., :rows - shift, :]
+        scratch[..., :rows - shift, :] |= mask[..., shift:, :]
+    np.copyto(out, scratch)
+    for shift in range(1, radius + 1):
+        out[..., :, shift:] |= scratch[..., :, :cols - shift]
+        out[..., :, :cols - shift] |= scratch[..., :, shift:]
+    return out
+
+
+class VisibilityEngine:
+    """
+    Fog-of-war for one square grid.
+
+    Builds the union of every unit's (2 * vision_range + 1) square of vision
+    in a single pass and writes observations into caller-supplied or
+    preallocated buffers instead of one full-size grid per unit.
+    """
+
+    def __init__(self, grid_size, vision_range, pad_value):
+        self.grid_size = grid_size
+        self.vision_range = vision_range
+        self.patch_size = 2 * vision_range + 1
+        self._mask = np.zeros((grid_size, grid_size), dtype=bool)
+        self._occupancy = np.zeros((grid_size, grid_size), dtype=bool)
+        self._scratch = np.zeros((grid_size, grid_size), dtype=bool)
+        # Grid copy with a vision_range border so patches near the edge need no bounds checks
+        self._padded = np.full((grid_size + 2 * vision_range,) * 2, pad_value, dtype=np.int64)
+        self._offsets = np.arange(self.patch_size)
+
+    def vision_mask(self, positions):
+        """
+        Boolean mask of cells seen by any of the given (x, y) positions.
+        The returned array is an internal buffer reused on the next call.
+        """
+        r = self.vision_range
+        mask = self._mask
+        positions = np.asarray(positions).reshape(-1, 2)
+        if len(positions) <= STAMP_LIMIT:
+            mask.fill(False)
+            for x, y in positions:
+                mask[max(0, x - r):x + r + 1, max(0, y - r):y + r + 1] = True
+            return mask
+
+        self._occupancy.fill(False)
+        self._occupancy[positions[:, 0], positions[:, 1]] = True
+        return dilate(self._occupancy, r, out=mask, scratch=self._scratch)
+
+    def observe(self, grid, positions, out=None):
+        """
+        Write grid into out with every cell outside the vision of positions set
+        to FOG, and return (out, mask). out is allocated if not given.
+        """
+        mask = self.vision_mask(positions)
+        if out is None:
+            out = np.empty_like(grid)
+        out.fill(FOG)
+        np.copyto(out, grid, where=mask)
+        return out, mask
+
+    def patches(self, grid, positions, alive=None, out=None):
+        """
+        Ego-centric (len(positions), patch_size, patch_size) crops of grid
+        centred on each position. Cells past the map edge hold pad_value
+        and rows for units that are not alive are filled with FOG.
+        """
+        r = self.vision_range
+        positions = np.asarray(positions).reshape(-1, 2)
+        self._padded[r:r + self.grid_size, r:r + self.grid_size] = grid
+
+        rows = positions[:, 0, None] + self._offsets
+        cols = positions[:, 1, None] + self._offsets
+        if out is None:
+            out = np.empty((len(positions), self.patch_size, self.patch_size), dtype=self._padded.dtype)
+        out[:] = self._padded[rows[:, :, None], cols[:, None, :]]
+        if alive is not None:
+            out[~np.asarray(alive)] = FOG
+        return out
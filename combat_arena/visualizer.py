@@ -0,0 +1,121 @@
+import numpy as np
+
+from .constants import INITIAL_HEALTH
+from .renderer import RasterRenderer, CELL_SIZE
+
+
+class GameVisualizer:
+    def __init__(self, env, figsize=(10, 10), cell_size=CELL_SIZE):
+        self.env = env
+        self.frames = []
+        self.figsize = figsize
+        self.renderer = RasterRenderer(env.grid_size, cell_size, INITIAL_HEALTH)
+    
+    def capture_frame(self):
+        """Capture current game state including all units"""
+        frame_data = {
+            'grid': self.env.grid.copy(),
+            'turn': self.env.turn,
+            'player1_units': [{
+                'position': unit['position'],
+                'health': unit['health'],
+                'id': unit['id']
+            } for unit in self.env.player1['units']],
+            'player2_units': [{
+                'position': unit['position'],
+                'health': unit['health'],
+                'id': unit['id']
+            } for unit in self.env.player2['units']],
+            'p1_capture_points': self.env.player1['capture_points'],
+            'p2_capture_points': self.env.player2['capture_points']
+        }
+        self.frames.append(frame_data)
+    
+    def export_replays(self, replay_path, output_dir, episodes=None, fmt="mp4", fps=2, processes=None):
+        """
+        Export many replay episodes to video files at this visualizer's cell
+        size, rendering in a process pool (see video_export.export_replays)
+        """
+        from .video_export import export_replays
+        return export_replays(replay_path, output_dir, episodes, fmt, fps, self.renderer.cell_size, processes)
+
+    def load_replay(self, reader, episode):
+        """Use an episode from a replay.ReplayReader as the frames; they are rebuilt lazily"""
+        self.frames = reader.episode(episode)
+
+    def _frame_image(self, frame_data):
+        """Render a captured frame into an RGB array"""
+        positions = np.array([[unit['position'] for unit in frame_data[key]]
+                              for key in ('player1_units', 'player2_units')])
+        health = np.array([[unit['health'] for unit in frame_data[key]]
+                           for key in ('player1_units', 'player2_units')])
+        return self.renderer.render(frame_data['grid'], positions, health)
+
+    def _frame_title(self, frame_data):
+        return (f"Turn: {frame_data['turn']}\n"
+                f"Team A Points: {frame_data['p1_capture_points']} | "
+                f"Team B Points: {frame_data['p2_capture_points']}\n"
+                f"Units A: {sum(1 for u in frame_data['player1_units'] if u['health'] > 0)} | "
+                f"Units B: {sum(1 for u in frame_data['player2_units'] if u['health'] > 0)}")
+
+    def _create_frame(self, frame_data, ax):
+        """Create visualization for a single frame with multiple units"""
+        ax.clear()
+        ax.imshow(self._frame_image(frame_data),
+                  extent=(0, self.env.grid_size, 0, self.env.grid_size),
+                  interpolation="nearest")
+
+        # Set grid properties
+        ax.set_xlim(0, self.env.grid_size)
+        ax.set_ylim(0, self.env.grid_size)
+        ax.set_xticks(range(self.env.grid_size))
+        ax.set_yticks(range(self.env.grid_size))
+        ax.set_xticklabels([])
+        ax.set_yticklabels([])
+        ax.set_aspect("equal")
+
+        # Update title with team information
+        ax.set_title(self._frame_title(frame_data))
+
+    def save_animation(self, filename="game_replay.gif", fps=2):
+        """Save captured frames as animation"""
+        if not self.frames:
+            raise ValueError("No frames captured!")
+        # matplotlib is only needed here, so capturing frames does not import it
+        import matplotlib.animation as animation
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=self.figsize)
+        self._create_frame(self.frames[0], ax)
+        image = ax.images[0]
+
+        # Only the image data and title change between frames
+        def animate(frame_idx):
+            image.set_data(self._frame_image(self.frames[frame_idx]))
+            ax.set_title(self._frame_title(self.frames[frame_idx]))
+            return [image, ax.title]
+        
+        anim = animation.FuncAnimation(
+            fig, animate, frames=len(self.frames),
+            interval=1000/fps, blit=False
+        )
+        
+        try:
+            if filename.endswith('.mp4'):
+                try:
+                    writer = animation.FFMpegWriter(fps=fps)
+                    anim.save(filename, writer=writer)
+                except (FileNotFoundError, RuntimeError):
+                    print("FFmpeg not found. Saving as GIF instead...")
+                    filename = filename.replace('.mp4', '.gif')
+                    anim.save(filename, writer='pillow', fps=fps)
+            else:
+                anim.save(filename, writer='pillow', fps=fps)
+                
+            print(f"Animation saved as: {filename}")
+            
+        except Exception as e:
+            print(f"Error saving animation: {str(e)}")
+            
+        finally:
+            plt.close(fig)
\ No newline at end of file
@@ -1,6 +1,4 @@
-from GameVis import GameVisualizer
-from new_env import CombatArenaEnv
-from example_agent import MultiUnitAgent
+from combat_arena import CombatArenaEnv, MultiUnitAgent, GameVisualizer
 
 if __name__ == "__main__":
     env = CombatArenaEnv()
@@ -0,0 +1,152 @@
+"""
+Equivalence checks between the env variants: the batched and subprocess
+envs must replay single CombatArenaEnv games exactly, the batched agents
+must match the per-env ones, and snapshots must replay identically.
+
+    pytest -q
+"""
+import numpy as np
+import pytest
+
+from combat_arena.agent import MultiUnitAgent
+from combat_arena.batched_env import BatchedCombatArenaEnv
+from combat_arena.constants import ATTACK, DEFEND, MOVES
+from combat_arena.encoding import allocate_observation, encode_observation
+from combat_arena.env import CombatArenaEnv
+from combat_arena.pathfinding import PathfindingAgent
+from combat_arena.subproc_env import SubprocCombatArenaEnv
+
+NUM_ENVS = 4
+SEED = 11
+# Short episodes, so every run also goes through done and auto-reset
+MAX_TURNS = 30
+STEPS = 100
+ACTION_CODES = np.array((-1, ATTACK, DEFEND) + tuple(MOVES))
+ARRAY_KEYS = ("unit_positions", "unit_health", "opponent_positions", "opponent_health", "opponent_visible")
+
+
+def random_actions(rng, num_envs, num_units):
+    return rng.choice(ACTION_CODES, size=(num_envs, 2, num_units)).astype(np.int8)
+
+
+def assert_same_observation(single, batched):
+    assert (np.asarray(single["grid"]) == batched["grid"]).all()
+    assert list(single["units"]) == batched["units"]
+    assert list(single["visible_opponents"]) == batched["visible_opponents"]
+    assert single["capture_points"] == batched["capture_points"]
+    assert single["turn"] == batched["turn"]
+    for key in ARRAY_KEYS:
+        assert (single[key] == batched[key]).all(), key
+
+
+def singles():
+    return [CombatArenaEnv(max_turns=MAX_TURNS, seed=SEED + i) for i in range(NUM_ENVS)]
+
+
+def test_batched_env_matches_single_envs():
+    envs = singles()
+    batched = BatchedCombatArenaEnv(NUM_ENVS, max_turns=MAX_TURNS, seed=SEED)
+    observations = batched.get_observations()
+    for i, env in enumerate(envs):
+        for team, observation in enumerate((env.get_observation_for_agent(True), env.get_observation_for_agent(False))):
+            assert_same_observation(observation, batched.observation_for(observations, i, team == 0))
+
+    rng = np.random.default_rng(0)
+    for _ in range(STEPS):
+        actions = random_actions(rng, NUM_ENVS, batched.num_units)
+        observations, rewards, dones, info = batched.step(actions)
+        for i, env in enumerate(envs):
+            obs_1, obs_2, reward, done, _ = env.step((actions[i, 0], actions[i, 1]))
+            assert list(rewards[i]) == reward
+            assert dones[i] == done
+            source = info["final_observation"] if done else observations
+            for team, observation in enumerate((obs_1, obs_2)):
+                assert_same_observation(observation, batched.observation_for(source, i, team == 0))
+            if done:
+                assert_same_observation(env.reset()[0], batched.observation_for(observations, i, True))
+
+
+def test_subproc_env_matches_single_envs():
+    envs = singles()
+    encoded = allocate_observation(envs[0].grid_size, envs[0].num_units)
+    rng = np.random.default_rng(0)
+    with SubprocCombatArenaEnv(NUM_ENVS, envs_per_worker=2, max_turns=MAX_TURNS, seed=SEED) as subproc:
+        subproc.reset(seed=SEED)
+        for _ in range(STEPS):
+            actions = random_actions(rng, NUM_ENVS, subproc.num_units)
+            observations, rewards, dones, info = subproc.step(actions)
+            for i, env in enumerate(envs):
+                obs_1, obs_2, reward, done, _ = env.step((actions[i, 0], actions[i, 1]))
+                assert list(rewards[i]) == reward
+                assert dones[i] == done
+                source = info["final_observation"] if done else observations
+                for team, observation in enumerate((obs_1, obs_2)):
+                    for key, value in encode_observation(observation, team, encoded).items():
+                        assert (value == source[key][i, team]).all(), key
+                if done:
+                    env.reset()
+
+
+def test_select_actions_batch_matches_select_actions():
+    batched = BatchedCombatArenaEnv(NUM_ENVS * 4, max_turns=MAX_TURNS, seed=SEED)
+    batch_agent, dict_agent = MultiUnitAgent(seed=9), MultiUnitAgent(seed=9)
+    observations = batched.get_observations()
+    for _ in range(STEPS):
+        actions = np.stack([batch_agent.select_actions_batch(observations, team) for team in range(2)], axis=1)
+        # Same draw order as the batch calls: every env for player 1, then every env for player 2
+        action_dicts = [
+            [dict_agent.select_actions(batched.observation_for(observations, i, team == 0))
+             for i in range(batched.num_envs)]
+            for team in range(2)
+        ]
+        expected = batched.actions_from_dicts(list(zip(*action_dicts)))
+        assert (actions == expected).all()
+        observations = batched.step(actions)[0]
+
+
+def test_pathfinding_batch_matches_select_actions():
+    batched = BatchedCombatArenaEnv(NUM_ENVS, max_turns=MAX_TURNS, seed=SEED)
+    batch_agent = PathfindingAgent(seed=9)
+    # One dict agent per env and player, all drawing from one generator like the batch agent
+    dict_agents = [[PathfindingAgent() for _ in range(batched.num_envs)] for _ in range(2)]
+    rng = np.random.default_rng(9)
+    for agent in dict_agents[0] + dict_agents[1]:
+        agent.rng = rng
+    observations = batched.get_observations()
+    for _ in range(STEPS):
+        actions = np.stack([batch_agent.select_actions_batch(observations, team) for team in range(2)], axis=1)
+        action_dicts = [
+            [agent.select_actions(batched.observation_for(observations, i, team == 0))
+             for i, agent in enumerate(dict_agents[team])]
+            for team in range(2)
+        ]
+        assert (actions == batched.actions_from_dicts(list(zip(*action_dicts)))).all()
+        observations = batched.step(actions)[0]
+
+
+@pytest.mark.parametrize("rules", ["sequential", "simultaneous"])
+def test_set_state_and_clone_replay_identically(rules):
+    env = CombatArenaEnv(max_turns=MAX_TURNS, seed=SEED, rules=rules)
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        env.step(random_actions(rng, 1, env.num_units)[0])
+    actions = random_actions(rng, STEPS, env.num_units)
+
+    def replay(env):
+        trace = []
+        for step_actions in actions:
+            obs_1, _, reward, done, _ = env.step(step_actions)
+            trace.append((reward, done, env.grid.tobytes(), env.units.health.tobytes(), obs_1["grid"].tobytes()))
+            if done:
+                env.reset()
+                trace.append(env.grid.tobytes())
+        return trace
+
+    state = env.get_state()
+    clone = env.clone()
+    expected = replay(env)
+    assert replay(clone) == expected
+    env.set_state(state)
+    assert replay(env) == expected
+    env.set_state(state.tobytes())
+    assert replay(env) == expected
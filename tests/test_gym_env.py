@@ -0,0 +1,52 @@
+"""
+The Gymnasium and PettingZoo wrappers against the libraries' own API
+checkers. Skipped when gymnasium or pettingzoo is not installed.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("gymnasium")
+
+from gymnasium.utils.env_checker import check_env  # noqa: E402
+
+from combat_arena.gym_env import CombatArenaGymEnv, CombatArenaParallelEnv  # noqa: E402
+from combat_arena.mapgen import MapPool  # noqa: E402
+
+# check_env can only try other render modes on envs made with gymnasium.make
+pytestmark = [pytest.mark.filterwarnings("error"), pytest.mark.filterwarnings("ignore:.*not having a spec")]
+
+
+@pytest.mark.parametrize("render_mode", [None, "rgb_array"])
+def test_gym_env_passes_check_env(render_mode):
+    check_env(CombatArenaGymEnv(render_mode=render_mode), skip_render_check=False)
+
+
+def test_gym_env_resets_to_a_map_pool_scenario():
+    pool = MapPool(3, 9, 2, seed=4)
+    env = CombatArenaGymEnv(grid_size=9, num_units=2, map_pool=pool)
+    check_env(env)
+    env.reset(seed=0, options={"scenario_id": 2})
+    assert (env.env.terrain == pool.terrain[2]).all()
+
+
+def test_gym_env_seeds_replay():
+    env = CombatArenaGymEnv()
+    actions = np.random.default_rng(0).integers(0, env.action_space.nvec, size=(20, len(env.action_space.nvec)))
+
+    def run():
+        observation, _ = env.reset(seed=7)
+        trace = [observation["grid"]]
+        for action in actions:
+            observation, reward, terminated, truncated, _ = env.step(action)
+            trace.append(observation["grid"])
+            if terminated or truncated:
+                break
+        return trace
+
+    assert all((a == b).all() for a, b in zip(run(), run(), strict=True))
+
+
+def test_parallel_env_passes_the_pettingzoo_api_tests():
+    pettingzoo_test = pytest.importorskip("pettingzoo.test")
+    pettingzoo_test.parallel_api_test(CombatArenaParallelEnv(), num_cycles=100)
+    pettingzoo_test.parallel_seed_test(CombatArenaParallelEnv)
@@ -0,0 +1,94 @@
+"""
+Replay round trips: episodes written with ReplayWriter read back with
+ReplayReader as the same frames GameVisualizer captured while they played.
+"""
+import pytest
+
+from combat_arena.agent import MultiUnitAgent
+from combat_arena.env import CombatArenaEnv
+from combat_arena.replay import FOOTER, MAGIC, ReplayReader, ReplayWriter
+from combat_arena.visualizer import GameVisualizer
+
+EPISODES = 5
+# Fewer episodes per chunk than episodes, so reads cross chunk boundaries
+CHUNK_EPISODES = 2
+FRAME_KEYS = ("turn", "player1_units", "player2_units", "p1_capture_points", "p2_capture_points")
+
+
+@pytest.fixture(scope="module")
+def recording(tmp_path_factory):
+    """Path of a replay file with EPISODES agent-vs-agent games, their frames and their actions"""
+    path = tmp_path_factory.mktemp("replay") / "games.bin"
+    env = CombatArenaEnv(seed=5)
+    agents = MultiUnitAgent(seed=1), MultiUnitAgent(seed=2)
+    visualizer = GameVisualizer(env)
+    frames, actions = [], []
+    with ReplayWriter(path, chunk_episodes=CHUNK_EPISODES) as writer:
+        for episode in range(EPISODES):
+            observations = env.reset()
+            visualizer.frames = []
+            visualizer.capture_frame()
+            writer.begin_episode(env, episode=episode)
+            episode_actions = []
+            done = False
+            while not done:
+                step_actions = tuple(agent.select_actions(obs) for agent, obs in zip(agents, observations))
+                *observations, _, done, _ = env.step(step_actions)
+                writer.record_step(env, step_actions)
+                visualizer.capture_frame()
+                episode_actions.append(step_actions)
+            writer.end_episode()
+            frames.append(visualizer.frames)
+            actions.append(episode_actions)
+    return path, frames, actions
+
+
+def test_round_trip_frames(recording):
+    path, frames, _ = recording
+    with ReplayReader(path) as reader:
+        assert len(reader) == EPISODES
+        # Out of order, so chunks are decompressed again
+        for episode in (3, 0, 4, 1, 2):
+            replayed = reader.episode(episode)
+            assert reader.metadata(episode) == {"episode": episode}
+            assert reader.turns(episode) == len(frames[episode]) - 1
+            assert len(replayed) == len(frames[episode])
+            for turn, expected in enumerate(frames[episode]):
+                frame = replayed[turn]
+                assert (frame["grid"] == expected["grid"]).all(), (episode, turn)
+                for key in FRAME_KEYS:
+                    assert frame[key] == expected[key], (episode, turn, key)
+
+
+def test_round_trip_actions(recording):
+    path, _, actions = recording
+    with ReplayReader(path) as reader:
+        for episode, episode_actions in enumerate(actions):
+            stored = reader.episode(episode).actions
+            for turn, (actions_1, actions_2) in enumerate(episode_actions):
+                for team, team_actions in enumerate((actions_1, actions_2)):
+                    for unit_id, action in team_actions.items():
+                        assert stored[turn, team, int(unit_id.rsplit("U", 1)[1])] == action
+
+
+def test_frames_past_the_end_raise(recording):
+    path, frames, _ = recording
+    with ReplayReader(path) as reader:
+        with pytest.raises(IndexError):
+            reader.frame(0, len(frames[0]))
+
+
+def test_foreign_and_truncated_files_are_rejected(recording, tmp_path):
+    path, _, _ = recording
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"not a replay at all, just some bytes")
+    with pytest.raises(ValueError, match="not a replay file"):
+        ReplayReader(foreign)
+
+    # A writer that was never closed leaves no index, or no chunks at all
+    data = path.read_bytes()
+    for length in (len(data) - FOOTER.size, len(MAGIC)):
+        truncated = tmp_path / "truncated.bin"
+        truncated.write_bytes(data[:length])
+        with pytest.raises(ValueError, match="no index"):
+            ReplayReader(truncated)
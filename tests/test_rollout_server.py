@@ -0,0 +1,96 @@
+"""
+Rollout server round trips: a client opens, resets, steps and closes a
+pool over a real socket and gets the same batches as a local ArenaPool,
+and bad requests get ERROR replies without dropping the connection.
+"""
+import asyncio
+import multiprocessing as mp
+import re
+
+import numpy as np
+import pytest
+
+from combat_arena.constants import DEFEND
+from combat_arena.rollout_server import ArenaPool, RolloutClient, RolloutServer, decode_batch
+
+NUM_ARENAS = 3
+SEED = 5
+# Short episodes, so the steps also cover auto-reset
+OPTIONS = {"grid_size": 9, "num_units": 2, "max_turns": 6}
+STEPS = 20
+
+
+def serve(client_session):
+    """Run client_session(client) against a fresh server on an ephemeral TCP port"""
+    async def main():
+        server = await RolloutServer(port=0, workers=2).start()
+        client = await RolloutClient.connect(port=server.port)
+        try:
+            return await client_session(client)
+        finally:
+            await client.close()
+            await server.close()
+    result = asyncio.run(main())
+    # Closing the connection stops its pool's worker process
+    assert not mp.active_children()
+    return result
+
+
+def test_open_reset_step_close_match_a_local_pool():
+    local = ArenaPool(NUM_ARENAS, seed=SEED, **OPTIONS)
+    layout = local.layout
+    rng = np.random.default_rng(0)
+    actions = rng.integers(-1, DEFEND + 1, size=(STEPS, NUM_ARENAS, 2, OPTIONS["num_units"])).astype(np.int8)
+
+    async def session(client):
+        spec = await client.open(NUM_ARENAS, seed=SEED, **OPTIONS)
+        assert spec == local.spec()
+        batches = [await client.reset()]
+        # Pipelined steps come back in order
+        pending = [await client.submit_step(step_actions) for step_actions in actions]
+        for step in pending:
+            batches.append(await step)
+        return batches
+
+    reset, *steps = serve(session)
+    expected = decode_batch(local.reset(), layout)
+    for name, array in reset.items():
+        assert (array == expected[name]).all(), name
+    episodes = 0
+    for step_actions, (observations, rewards, dones) in zip(actions, steps):
+        expected = decode_batch(local.step(step_actions), layout)
+        for name, array in observations.items():
+            assert (array == expected[name]).all(), name
+        assert (rewards == expected["rewards"]).all()
+        assert (dones == expected["dones"]).all()
+        episodes += int(dones.sum())
+    assert episodes > 0
+
+
+@pytest.mark.parametrize("send, message", [
+    (lambda client: client.reset(), "OPEN a pool first"),
+    (lambda client: client.open(2, colour="red"), "ValueError: Unknown options ['colour']"),
+    (lambda client: client.open(0), "ValueError: num_arenas must be between 1"),
+    (lambda client: client.open(2, rules="chess"), "ValueError: Unknown rules 'chess'"),
+])
+def test_bad_requests_get_error_replies(send, message):
+    async def session(client):
+        with pytest.raises(RuntimeError, match=re.escape(message)):
+            await send(client)
+        # The connection survives the error
+        return await client.open(1, **OPTIONS)
+
+    assert serve(session)["num_arenas"] == 1
+
+
+def test_step_with_wrong_action_shape_gets_an_error_reply():
+    async def session(client):
+        await client.open(NUM_ARENAS, **OPTIONS)
+        await client.reset()
+        with pytest.raises(RuntimeError, match="STEP expects"):
+            await client.step(np.zeros((NUM_ARENAS + 1, 2, OPTIONS["num_units"]), dtype=np.int8))
+        return await client.step(np.full((NUM_ARENAS, 2, OPTIONS["num_units"]), DEFEND, dtype=np.int8))
+
+    observations, rewards, dones = serve(session)
+    assert observations["turn"].tolist() == [1] * NUM_ARENAS
+    assert not dones.any()
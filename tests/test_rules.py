@@ -0,0 +1,110 @@
+"""
+Scenario tests for the rule sets: each map in SCENARIOS sets up one
+situation, and the tests check the outcome documented in
+CombatArenaEnv._resolve_simultaneous, next to the sequential one where
+they differ.
+"""
+import numpy as np
+import pytest
+
+from combat_arena.constants import (
+    ATTACK, DEFEND, MOVE_LEFT, MOVE_RIGHT, CAPTURE_P1, PLAYER1, PLAYER2,
+    HIT_REWARD, BLOCKED_MOVE_REWARD, CAPTURE_REWARD, ATTACK_DAMAGE, INITIAL_HEALTH, NO_UNIT
+)
+from combat_arena.env import CombatArenaEnv
+from combat_arena.scenarios import compile_scenarios
+
+SCENARIOS = {
+    "grid_size": 5,
+    "num_units": 1,
+    "scenarios": [
+        {"name": "adjacent", "map": ["#####", "#AB.#", "#...#", "#...#", "#####"]},
+        {"name": "gap", "map": ["#####", "#A.B#", "#...#", "#...#", "#####"]},
+        {"name": "capture", "map": ["#####", "#A+B#", "#...#", "#...#", "#####"]},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def bank(tmp_path_factory):
+    return compile_scenarios(SCENARIOS, tmp_path_factory.mktemp("rules_bank"))
+
+
+def make_env(bank, rules, scenario):
+    env = CombatArenaEnv(grid_size=bank.grid_size, num_units=bank.num_units, map_pool=bank, rules=rules)
+    env.reset(scenario_id=scenario)
+    return env
+
+
+def force_hits(env, health):
+    """Make every attack roll land from the next step on, with units at the given (2, units) health"""
+    env.step(([DEFEND], [DEFEND]))  # Past turn 0, which draws a fresh roll block
+    state = env.get_state()
+    state["has_rolls"] = True
+    state["hits"] = True
+    state["health"] = health
+    env.set_state(state)
+
+
+def positions(env):
+    return env.units.positions.tolist()
+
+
+def test_simultaneous_swap_fails_for_both_units(bank):
+    env = make_env(bank, "simultaneous", "adjacent")
+    start = positions(env)
+    _, _, rewards, _, _ = env.step(([MOVE_RIGHT], [MOVE_LEFT]))
+    assert positions(env) == start
+    assert rewards == [BLOCKED_MOVE_REWARD, BLOCKED_MOVE_REWARD]
+
+
+@pytest.mark.parametrize("rules, expected_rewards, expected_cells", [
+    # Both units claim (1, 2): neither gets it
+    ("simultaneous", [BLOCKED_MOVE_REWARD, BLOCKED_MOVE_REWARD], [[[1, 1]], [[1, 3]]]),
+    # Player 1 moves first and takes it
+    ("sequential", [0, BLOCKED_MOVE_REWARD], [[[1, 2]], [[1, 3]]]),
+])
+def test_two_units_moving_into_one_cell(bank, rules, expected_rewards, expected_cells):
+    env = make_env(bank, rules, "gap")
+    _, _, rewards, _, _ = env.step(([MOVE_RIGHT], [MOVE_LEFT]))
+    assert rewards == expected_rewards
+    assert positions(env) == expected_cells
+    assert env.occupant[1, 2] == (0 if rules == "sequential" else NO_UNIT)
+
+
+@pytest.mark.parametrize("rules, expected_rewards, expected_alive", [
+    # Damage lands together, so both die
+    ("simultaneous", [HIT_REWARD, HIT_REWARD], [[False], [False]]),
+    # Player 2's unit dies before it can act
+    ("sequential", [HIT_REWARD, 0], [[True], [False]]),
+])
+def test_mutual_attacks_on_last_health(bank, rules, expected_rewards, expected_alive):
+    env = make_env(bank, rules, "adjacent")
+    force_hits(env, np.full((2, 1), ATTACK_DAMAGE))
+    _, _, rewards, done, _ = env.step(([ATTACK], [ATTACK]))
+    assert rewards == expected_rewards
+    assert env.units.alive.tolist() == expected_alive
+    assert done
+    # Dead units leave the grid and the spatial index
+    for alive, cell, marker in zip(expected_alive, positions(env), (PLAYER1, PLAYER2)):
+        x, y = cell[0]
+        assert (env.grid[x, y] == marker) == alive[0]
+        assert (env.occupant[x, y] != NO_UNIT) == alive[0]
+
+
+def test_simultaneous_unit_killed_this_turn_does_not_move(bank):
+    env = make_env(bank, "simultaneous", "adjacent")
+    force_hits(env, np.array([[INITIAL_HEALTH], [ATTACK_DAMAGE]]))
+    start = positions(env)
+    env.step(([ATTACK], [MOVE_RIGHT]))
+    assert positions(env) == start
+    assert not env.units.alive[1, 0]
+
+
+@pytest.mark.parametrize("rules", ["sequential", "simultaneous"])
+def test_capture(bank, rules):
+    env = make_env(bank, rules, "capture")
+    _, _, rewards, _, _ = env.step(([MOVE_RIGHT], [DEFEND]))
+    assert rewards == [CAPTURE_REWARD, 0]
+    assert env.terrain[1, 2] == CAPTURE_P1
+    assert env.player1["capture_points"] == 1
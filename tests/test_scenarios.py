@@ -0,0 +1,101 @@
+"""
+Scenario banks: compiling scenario files, resetting envs to their maps,
+and the ValueError every malformed scenario file or bank raises.
+"""
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from combat_arena.constants import WALL, CAPTURE_NEUTRAL, PLAYER1, PLAYER2
+from combat_arena.env import CombatArenaEnv
+from combat_arena.scenarios import INDEX_FILE, ScenarioBank, compile_scenarios
+
+CORRIDOR = ["#####", "A...B", "A.+.B", "#####", "#####"]
+
+
+def scenario_file(*scenarios, grid_size=5, num_units=2):
+    return {"grid_size": grid_size, "num_units": num_units, "scenarios": list(scenarios)}
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return compile_scenarios(scenario_file(
+        {"name": "corridor", "stage": 0, "map": CORRIDOR},
+        {"name": "open", "stage": 1, "generate": {"seed": 3, "count": 4, "wall_density": 0.0}},
+    ), tmp_path / "bank")
+
+
+def test_compile_and_look_up(bank):
+    assert len(bank) == 5
+    assert bank.names == ["corridor", "open-0", "open-1", "open-2", "open-3"]
+    assert bank.stages.tolist() == [0, 1, 1, 1, 1]
+    terrain, spawns = bank["corridor"]
+    assert (terrain[0] == WALL).all() and terrain[2, 2] == CAPTURE_NEUTRAL
+    # Spawns are given to slots row by row
+    assert spawns.tolist() == [[[1, 0], [2, 0]], [[1, 4], [2, 4]]]
+    with pytest.raises(KeyError, match="No scenario named 'maze'"):
+        bank.find("maze")
+
+
+def test_env_resets_to_a_named_scenario(bank):
+    env = CombatArenaEnv(grid_size=5, num_units=2, map_pool=bank, seed=0)
+    env.reset(scenario_id="corridor")
+    assert env.grid[1, 0] == PLAYER1 and env.grid[2, 4] == PLAYER2
+    # Draws only pick scenarios from the chosen stage
+    env.map_pool = bank.stage(1)
+    for _ in range(10):
+        env.reset()
+        assert not (env.terrain == WALL).any()
+
+
+def test_bank_pickles_as_its_path(bank):
+    copy = pickle.loads(pickle.dumps(bank.stage(1)))
+    assert copy.path == bank.path
+    assert copy.ids.tolist() == [1, 2, 3, 4]
+    assert (copy.terrain == bank.terrain).all()
+
+
+@pytest.mark.parametrize("source, message", [
+    (scenario_file({"name": "short", "map": CORRIDOR[:4]}), "must be 5 rows of 5 cells"),
+    (scenario_file({"name": "wide", "map": CORRIDOR[:4] + ["######"]}), "must be 5 rows of 5 cells"),
+    (scenario_file({"name": "lava", "map": CORRIDOR[:4] + ["#~~~#"]}), "unknown map cells"),
+    (scenario_file({"name": "crowded", "map": CORRIDOR[:4] + ["#.A.#"]}), "3 A spawns, expected 2"),
+    (scenario_file({"name": "split", "map": ["#####", "A.#.B", "A.#.B", "#####", "#####"]}), "not every spawn"),
+    (scenario_file({"name": "empty"}), "needs a map or a generate entry"),
+    (scenario_file(), "holds no scenarios"),
+    (scenario_file({"name": "twin", "map": CORRIDOR}, {"name": "twin", "map": CORRIDOR}), "Duplicate scenario names"),
+])
+def test_bad_scenario_files_raise_value_error(tmp_path, source, message):
+    with pytest.raises(ValueError, match=message):
+        compile_scenarios(source, tmp_path / "bank")
+    # Nothing half-written is left to open
+    assert not (tmp_path / "bank" / INDEX_FILE).exists()
+
+
+def test_bad_map_errors_name_the_scenario(tmp_path):
+    with pytest.raises(ValueError, match="Scenario 'short'"):
+        compile_scenarios(scenario_file({"name": "short", "map": CORRIDOR[:4]}), tmp_path / "bank")
+
+
+def test_compile_from_a_json_path(tmp_path):
+    path = tmp_path / "scenarios.json"
+    path.write_text(json.dumps(scenario_file({"name": "corridor", "map": CORRIDOR})))
+    bank = compile_scenarios(path, tmp_path / "bank")
+    assert bank.names == ["corridor"]
+    assert np.array_equal(ScenarioBank(tmp_path / "bank").terrain, bank.terrain)
+
+
+def test_bad_banks_raise_value_error(bank):
+    with pytest.raises(ValueError, match="No scenarios in stage"):
+        bank.stage(7)
+    index_path = bank.path / INDEX_FILE
+    with open(index_path) as f:
+        index = json.load(f)
+    with open(index_path, "w") as f:
+        json.dump(dict(index, version=0), f)
+    with pytest.raises(ValueError, match="version 0 bank"):
+        ScenarioBank(bank.path)
+    with pytest.raises(ValueError, match="map_pool holds 5x5 maps for 2 units"):
+        CombatArenaEnv(grid_size=7, num_units=2, map_pool=bank)